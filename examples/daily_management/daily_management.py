@@ -1,15 +1,14 @@
 import os
 import shutil
+import filecmp
 import numpy as np
 import pandas as pd
 from datetime import timedelta
 import configparser
-import joblib
 
 from pfstratsim.datasets import fetch_prices
-from pfstratsim.problems import *
-from pfstratsim.triggers import *
-from pfstratsim.solvers import *
+from pfstratsim.triggers import Trigger, IdenticalDistributionTest
+from pfstratsim.utils import dump_object, write_csv
 
 
 def main():
@@ -27,15 +26,15 @@ def main():
     prtfl_valtn = params.get("prtfl_valtn")
 
     # Set the input and output directories
-    input_dir = os.path.join(crnt_dir, str(prev_time).split(" ")[0])
-    output_dir = os.path.join(crnt_dir, str(crnt_time).split(" ")[0])
+    input_dir = None if prev_time is None else os.path.join(crnt_dir, prev_time.strftime("%Y-%m-%d"))
+    output_dir = os.path.join(crnt_dir, crnt_time.strftime("%Y-%m-%d"))
     objects_dir = os.path.join(output_dir, "objects")
-    if not os.path.exists(objects_dir):
-        os.makedirs(objects_dir)
+    param_file_path = os.path.join(crnt_dir, param_file_name)
+    price_file_path = os.path.join(crnt_dir, price_file_name)
+    os.makedirs(objects_dir, exist_ok=True)
 
     # Prepare for updating the prices data
-    prices = pd.read_csv(os.path.join(crnt_dir, price_file_name), index_col=0)
-    prices.index = pd.to_datetime(prices.index)
+    prices = pd.read_csv(price_file_path, index_col=0, parse_dates=[0])
     asset_name_list = prices.columns.to_list()
 
     # Update the price data
@@ -55,8 +54,8 @@ def main():
                 save_dir=crnt_dir,
                 **params
             )
-            prices = pd.concat([prices, prices_added], axis=0).groupby(level=0).last()
-            prices.to_csv(os.path.join(crnt_dir, price_file_name))
+            prices = pd.concat([prices[~prices.index.isin(prices_added.index)], prices_added], axis=0).sort_index()
+            write_csv(prices, price_file_path)
 
     # Prepare for assessing the necessity of rebalancing and calculating the optimal asset proportions
     start_time = crnt_time - timedelta(days=window_day)
@@ -64,12 +63,9 @@ def main():
     if prev_time is None:
         prev_prices = None
     else:
-        prev_prices = pd.read_csv(os.path.join(input_dir, "crnt_prices.csv"), index_col=0)
-        prev_prices.index = pd.to_datetime(prev_prices.index)
+        prev_prices = pd.read_csv(os.path.join(input_dir, "crnt_prices.csv"), index_col=0, parse_dates=[0])
 
     trigger = Trigger(IdenticalDistributionTest(**params))
-    problem = SharpeRatioMaximization(**params)
-    solver = Solver(MathematicalProgramming(**params))
 
     # Asses the necessity of rebalancing
     is_reblncng, idntcl_dstrbtn_prob = trigger.assess(
@@ -78,44 +74,62 @@ def main():
         prev_prices=prev_prices,
     )
     if idntcl_dstrbtn_prob is None:
-        idntcl_dstrbtn_prob = pd.DataFrame([np.nan for _ in range(len(asset_name_list))], index=asset_name_list).T
+        idntcl_dstrbtn_prob = pd.DataFrame(np.full((1, len(asset_name_list)), np.nan), columns=asset_name_list)
     idntcl_dstrbtn_prob.index = ['idntcl_dstrbtn_prob']
     summary = idntcl_dstrbtn_prob.copy()
 
     # Store the main data
-    shutil.copy2(os.path.join(crnt_dir, param_file_name), output_dir)
-    crnt_prices.to_csv(os.path.join(output_dir, "crnt_prices.csv"))
-    joblib.dump(params, os.path.join(objects_dir, "params"))
-    joblib.dump(prtfl_valtn, os.path.join(objects_dir, "prtfl_valtn"))
-    joblib.dump(prev_prices, os.path.join(objects_dir, "prev_prices"))
-    joblib.dump(crnt_time, os.path.join(objects_dir, "crnt_time"))
-    joblib.dump(crnt_prices, os.path.join(objects_dir, "crnt_prices"))
-    joblib.dump(trigger, os.path.join(objects_dir, "trigger"))
-    joblib.dump(idntcl_dstrbtn_prob, os.path.join(objects_dir, "idntcl_dstrbtn_prob"))
+    # Copy the parameters unless the same ones are already stored, e.g. by a rerun on the same day. A hardlink is not
+    # used since the parameter file is edited for the next day and the stored one must not follow the edit.
+    stored_param_file_path = os.path.join(output_dir, param_file_name)
+    if not (os.path.exists(stored_param_file_path) and filecmp.cmp(param_file_path, stored_param_file_path)):
+        shutil.copy2(param_file_path, output_dir)
+    write_csv(crnt_prices, os.path.join(output_dir, "crnt_prices.csv"))
+    state = {
+        "params": params,
+        "prtfl_valtn": prtfl_valtn,
+        "crnt_time": crnt_time,
+        "trigger": trigger,
+    }
+    frames = {
+        "crnt_prices": crnt_prices,
+        "idntcl_dstrbtn_prob": idntcl_dstrbtn_prob,
+    }
+    if prev_prices is not None:
+        frames["prev_prices"] = prev_prices
 
     # Calculate the optimal asset proportions
     if is_reblncng:
+        # Import the problem and the solver only here since loading the optimization modeling is costly.
+        from pfstratsim.problems import SharpeRatioMaximization
+        from pfstratsim.solvers import Solver, MathematicalProgramming
+
+        problem = SharpeRatioMaximization(**params)
+        solver = Solver(MathematicalProgramming(**params))
         is_success = problem.define(crnt_prices, crnt_time)
-        joblib.dump(problem, os.path.join(objects_dir, "problem"))
+        state["problem"] = problem
         if is_success:
             is_success = solver.solve(problem, **params)
-            joblib.dump(solver, os.path.join(objects_dir, "solver"))
+            state["solver"] = solver
             if is_success:
                 asset_props = solver.asset_props_
                 asset_props.index = ['asset_props']
                 asset_valtns_reblncd = prtfl_valtn * asset_props
                 asset_valtns_reblncd.index = ['asset_valtns_reblncd']
-                latest_prices = pd.DataFrame(crnt_prices.iloc[-1,:]).T
-                latest_prices.index = ['latest_prices']
+                latest_prices = pd.DataFrame(crnt_prices.values[[-1], :], index=['latest_prices'], columns=asset_name_list)
                 asset_amounts = pd.DataFrame(asset_valtns_reblncd.values / latest_prices.values, index=['asset_amounts'], columns=asset_name_list)
-                summary = pd.concat([summary, asset_props, asset_valtns_reblncd, latest_prices, asset_amounts], axis=0)
+                summary_list = [summary, asset_props, asset_valtns_reblncd, latest_prices, asset_amounts]
+                summary = pd.DataFrame(
+                    np.vstack([data.values for data in summary_list]),
+                    index=[data.index[0] for data in summary_list], columns=asset_name_list
+                )
 
                 # Store the main data
-                joblib.dump(asset_props, os.path.join(objects_dir, "asset_props"))
-                joblib.dump(asset_valtns_reblncd, os.path.join(objects_dir, "asset_valtns_reblncd"))
-                joblib.dump(latest_prices, os.path.join(objects_dir, "latest_prices"))
-                joblib.dump(asset_amounts, os.path.join(objects_dir, "asset_amounts"))
-                joblib.dump(summary, os.path.join(objects_dir, "summary"))
+                frames["asset_props"] = asset_props
+                frames["asset_valtns_reblncd"] = asset_valtns_reblncd
+                frames["latest_prices"] = latest_prices
+                frames["asset_amounts"] = asset_amounts
+                frames["summary"] = summary
             else:
                 print("Problem solving failed.")
         else:
@@ -124,12 +138,15 @@ def main():
         print("Rebalancing not necessary.")
 
     # Store the main data
-    summary.to_csv(os.path.join(output_dir, "summary.csv"))
+    dump_object(state, os.path.join(objects_dir, "state.joblib"))
+    for name, frame in frames.items():
+        frame.to_parquet(os.path.join(objects_dir, f"{name}.parquet"), engine="pyarrow", compression="zstd")
+    write_csv(summary, os.path.join(output_dir, "summary.csv"))
 
 
 def read_params(setting_file_dir=".", setting_file_name="."):
     """Read the parameters from the setting file."""
-    param_file = configparser.ConfigParser()
+    param_file = configparser.ConfigParser(inline_comment_prefixes=("#",))
     param_file.read(os.path.join(setting_file_dir, setting_file_name), "utf-8")
 
     dataset_param_set = {
@@ -145,11 +162,13 @@ def read_params(setting_file_dir=".", setting_file_name="."):
         "trigger_class": str,
         "test_method": str,
         "prob_thrshld": float,
+        "test_n_jobs": int,
         "reblncng_intrvl_day": int,
     }
     problem_param_set = {
         "problem_class": str,
         "return_lower_qntl": float,
+        "cov_estimator": str,
     }
     solver_param_set = {
         "solver_class": str,
@@ -173,12 +192,9 @@ def read_params(setting_file_dir=".", setting_file_name="."):
     params = {}
     for section, param_set in all_param_set.items():
         for param_name, param_type in param_set.items():
-            try:
-                param_value = param_file.get(section, param_name)
-            except Exception as e:
-                print(e)
+            if not param_file.has_option(section, param_name):
                 continue
-            param_value = param_value.split('#')[0].replace(' ', '')
+            param_value = param_file.get(section, param_name).strip()
             if param_type == int:
                 params[param_name] = int(param_value)
             elif param_type == float:
@@ -27,9 +27,14 @@ def main():
         solver_class_abrvtd = "ep"
     elif solver_class == "mathematical_programming":
         solver_class_abrvtd = "mp"
+    elif solver_class == "quadratic_programming":
+        solver_class_abrvtd = "qp"
+    elif solver_class == "cvxpy_programming":
+        solver_class_abrvtd = "cvx"
     else:
         message = f"Invalid value for 'solver_class': {solver_class}." \
-                  f"'solver_class' must be in ['equal_proportion', 'mathematical_programming']."
+                  f"'solver_class' must be in ['equal_proportion', 'mathematical_programming', 'quadratic_programming'," \
+                  f" 'cvxpy_programming']."
         raise ValueError(message)
 
     result_dir = os.path.join(os.path.dirname(os.path.normpath(__file__)), "results", f"{problem_class_abrvtd}_{solver_class_abrvtd}")
@@ -1,10 +1,19 @@
 import os
+import numpy as np
 import pandas as pd
 from pandas_datareader import data
 from datetime import timedelta
+from functools import lru_cache
+from joblib import Parallel, delayed
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pacsv = None
 
 
-def load_sample_prices(asset_name_list, start_time, end_time, window_day=None, interest_rate=None, **params):
+def load_sample_prices(asset_name_list, start_time, end_time, window_day=None, interest_rate=None, is_cache=False,
+                       n_jobs=-1, **params):
     """Load the historical prices of the sample assets.
 
     Parameters
@@ -24,6 +33,13 @@ def load_sample_prices(asset_name_list, start_time, end_time, window_day=None, i
     interest_rate=None : float, default None
         The interest rate of cash.
 
+    is_cache : bool, default False
+        The option of whether to cache the historical prices of each asset as a Parquet file next to its CSV file and
+        read the cache instead of the CSV file from the next time on.
+
+    n_jobs : int, default -1
+        The number of threads to read the historical prices of the assets concurrently. If -1, all CPUs are used.
+
     params : dict
         The parameters not to be used in this method but necessary just to realize the API that can call this method by
         one way.
@@ -37,10 +53,11 @@ def load_sample_prices(asset_name_list, start_time, end_time, window_day=None, i
         start_time -= timedelta(days=window_day)
 
     data_dir = os.path.join(os.path.dirname(os.path.normpath(__file__)), "data")
-    sample_prices = pd.DataFrame()
-    for asset_name in asset_name_list:
-        all_data = pd.read_csv(os.path.join(data_dir, f"{asset_name}.csv"), index_col="Date", parse_dates=["Date"])
-        sample_prices[asset_name] = all_data["Close"][start_time:end_time]
+    sample_price_list = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_load_sample_price)(asset_name, data_dir, start_time, end_time, is_cache)
+        for asset_name in asset_name_list
+    )
+    sample_prices = pd.concat(sample_price_list, axis=1)
 
     if interest_rate is not None:
         sample_prices = _add_cash_data(sample_prices, interest_rate)
@@ -49,7 +66,7 @@ def load_sample_prices(asset_name_list, start_time, end_time, window_day=None, i
 
 
 def fetch_prices(asset_name_list, start_time, end_time=None, window_day=None, interest_rate=None, kind="Close", save_dir=".",
-                 is_save_each=True, is_save_all=True, save_file_name="all_assets_prices", **params):
+                 is_save_each=True, is_save_all=True, save_file_name="all_assets_prices", n_jobs=-1, **params):
     """Load the historical prices of the arbitrary assets.
 
     Parameters
@@ -84,6 +101,9 @@ def fetch_prices(asset_name_list, start_time, end_time=None, window_day=None, in
     save_file_name : str, default "all_assets_prices"
         The file name of the historical prices of all the assets.
 
+    n_jobs : int, default -1
+        The number of threads to fetch the historical prices of the assets concurrently. If -1, all CPUs are used.
+
     params : dict
         The parameters not to be used in this method but necessary just to realize the API that can call this method by
         one way.
@@ -95,16 +115,13 @@ def fetch_prices(asset_name_list, start_time, end_time=None, window_day=None, in
     """
     if window_day is not None:
         start_time -= timedelta(days=window_day)
-    prices = pd.DataFrame()
-    for asset_name in asset_name_list:
-        all_data = data.DataReader(asset_name, "yahoo", start_time, end_time)
-        all_data = all_data[start_time:end_time]  # extract data from start_time since DataReader fetches data from start_time - 1 day.
-        if save_dir is not None:
-            if not os.path.exists(save_dir):
-                os.makedirs(save_dir)
-            if is_save_each:
-                all_data.to_csv(os.path.join(save_dir, f"{asset_name}.csv"))
-        prices[asset_name] = all_data[kind]
+    if save_dir is not None:
+        os.makedirs(save_dir, exist_ok=True)
+    price_list = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_fetch_price)(asset_name, start_time, end_time, kind, save_dir, is_save_each)
+        for asset_name in asset_name_list
+    )
+    prices = pd.concat(price_list, axis=1)
 
     if interest_rate is not None:
         prices = _add_cash_data(prices, interest_rate)
@@ -115,6 +132,108 @@ def fetch_prices(asset_name_list, start_time, end_time=None, window_day=None, in
     return prices
 
 
+def _load_sample_price(asset_name, data_dir, start_time, end_time, is_cache):
+    """Load the historical prices of a sample asset.
+
+    Parameters
+    ----------
+    asset_name : str
+        The name of the asset.
+
+    data_dir : str
+        The directory of the historical prices of the sample assets.
+
+    start_time : Timestamp
+        The start time of the historical prices.
+
+    end_time : Timestamp
+        The end time of the historical prices.
+
+    is_cache : bool
+        The option of whether to use the Parquet file cache.
+
+    Returns
+    -------
+    sample_price : Series of shape (num_times) and float
+        The historical prices of the asset.
+    """
+    all_prices = _read_sample_price(os.path.join(data_dir, asset_name), is_cache)
+    return all_prices[start_time:end_time].rename(asset_name)
+
+
+@lru_cache(maxsize=128)
+def _read_sample_price(file_path, is_cache):
+    """Read all the historical close prices of a sample asset.
+
+    The result is memoized since the sample data never changes, so that repeated loads only slice the prices. Only the
+    date and close columns are decoded, with the pyarrow CSV reader if available.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the historical prices of the asset without the file extension.
+
+    is_cache : bool
+        The option of whether to use the Parquet file cache.
+
+    Returns
+    -------
+    all_prices : Series of shape (num_times) and float
+        All the historical close prices of the asset.
+    """
+    csv_file = f"{file_path}.csv"
+    cache_file = f"{file_path}.parquet"
+    if is_cache and os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(csv_file):
+        all_data = pd.read_parquet(cache_file, columns=["Close"])
+    elif pacsv is not None:
+        convert_options = pacsv.ConvertOptions(
+            include_columns=["Date", "Close"], column_types={"Date": pa.timestamp("ns"), "Close": pa.float64()}
+        )
+        all_data = pacsv.read_csv(csv_file, convert_options=convert_options).to_pandas().set_index("Date")
+        if is_cache:
+            all_data.to_parquet(cache_file)
+    else:
+        all_data = pd.read_csv(csv_file, usecols=["Date", "Close"], index_col="Date", parse_dates=["Date"])
+        if is_cache:
+            all_data.to_parquet(cache_file)
+    return all_data["Close"]
+
+
+def _fetch_price(asset_name, start_time, end_time, kind, save_dir, is_save_each):
+    """Fetch the historical prices of an arbitrary asset.
+
+    Parameters
+    ----------
+    asset_name : str
+        The name of the asset.
+
+    start_time : Timestamp
+        The start time of the historical prices.
+
+    end_time : Timestamp
+        The end time of the historical prices.
+
+    kind : {"Open", "High", "Low", "Close"}
+        The kind of the prices.
+
+    save_dir : str
+        The directory of the historical prices of the assets.
+
+    is_save_each : bool
+        The option of whether to save the historical prices of the asset in a file.
+
+    Returns
+    -------
+    price : Series of shape (num_times) and float
+        The historical prices of the asset.
+    """
+    all_data = data.DataReader(asset_name, "yahoo", start_time, end_time)
+    all_data = all_data[start_time:end_time]  # extract data from start_time since DataReader fetches data from start_time - 1 day.
+    if save_dir is not None and is_save_each:
+        all_data.to_csv(os.path.join(save_dir, f"{asset_name}.csv"))
+    return all_data[kind].rename(asset_name)
+
+
 def _add_cash_data(prices, interest_rate):
     """Add the historical prices of cash to the ones of the assets.
 
@@ -131,8 +250,10 @@ def _add_cash_data(prices, interest_rate):
     prices : DataFrame of shape (num_times, num_assets) and float
         The historical prices of the assets with ones of cash.
     """
-    cash_list = [1.0]  # init cash price doesn't affect its return and risk
-    for i in range(len(prices) - 1):
-        cash_list.append(cash_list[-1] * (1.0 + interest_rate / len(prices)))
-    prices['CASH'] = cash_list
+    num_times = len(prices)
+    growth_factor = 1.0 + interest_rate / num_times
+    # init cash price doesn't affect its return and risk
+    # Multiply the growth factor cumulatively as the original loop did, since the powers rounded one by one would make
+    # the returns of cash not exactly constant and its risks not exactly 0.
+    prices['CASH'] = np.concatenate([[1.0], np.cumprod(np.full(num_times - 1, growth_factor))])
     return prices
@@ -1,6 +1,7 @@
+import numpy as np
 from pyomo.environ import *
 
-from ..utils import calc_corr_cf, calc_asset_expctd_returns, calc_asset_expctd_risks
+from ..utils import calc_asset_returns, calc_corr_cf, shrink_corr_cf, calc_asset_expctd_returns, calc_asset_expctd_risks
 
 
 class Problem(object):
@@ -8,6 +9,11 @@ class Problem(object):
 
     Parameters
     ----------
+    cov_estimator : {"sample", "ledoit_wolf"}, default "sample"
+        The estimator of the expected covariances of the assets. If "ledoit_wolf", the correlation coefficients are
+        shrunk toward the identity matrix by the Ledoit-Wolf method, which keeps the covariances well-conditioned for
+        the moving window short compared with the number of the assets.
+
     params : dict
         The parameters not to be used in this class but necessary just to realize the API that can call the constructor
         of all the problems by one way.
@@ -26,7 +32,7 @@ class Problem(object):
     _num_assets_ : int
         The number of the assets.
 
-    _asset_expctd_returns_ : Series of shape (num_assets) and float
+    asset_expctd_returns_ : Series of shape (num_assets) and float
         The expected returns of the assets.
 
     _asset_expctd_risks_ : Series of shape (num_assets) and float
@@ -35,13 +41,22 @@ class Problem(object):
     _asset_expctd_corr_cf_ : DataFrame of shape (num_assets, num_assets) and float
         The expected correlation coefficients of the assets.
 
+    asset_expctd_cov_ : ndarray of shape (num_assets, num_assets) and float
+        The expected covariances of the assets.
+
     crnt_time_ : Timestamp
         The current date-time at which the problem is defined.
     """
-    def __init__(self, **params):
-        pass
+    def __init__(self, cov_estimator="sample", **params):
+        if cov_estimator not in ["sample", "ledoit_wolf"]:
+            message = f"Invalid value for 'cov_estimator': {cov_estimator}." \
+                      f"'cov_estimator' must be in ['sample', 'ledoit_wolf']."
+            raise ValueError(message)
+        self._cov_estimator = cov_estimator
+        self._abst_model_ = None
+        self._cncrt_model_ = None
 
-    def _reset(self, prices, crnt_time):
+    def _reset(self, prices, crnt_time, corr_cf=None):
         """Reset all the simulation parameters.
 
         Parameters
@@ -51,17 +66,25 @@ class Problem(object):
 
         crnt_time : Timestamp
             The current date-time at which the problem is defined.
+
+        corr_cf : DataFrame of shape (num_assets, num_assets) and float, default None
+            The correlation coefficients of the assets calculated in advance. If None, they are calculated from the
+            prices.
         """
-        self._abst_model_ = None
-        self._cncrt_model_ = None
         self._asset_name_list_ = prices.columns
         self._num_assets_ = len(prices.columns)
-        self._asset_expctd_returns_ = calc_asset_expctd_returns(prices=prices, dtype="Series")
-        self._asset_expctd_risks_ = calc_asset_expctd_risks(prices=prices, dtype="Series")
-        self._asset_expctd_corr_cf_ = calc_corr_cf(prices=prices)
+        # Calculate the returns once to share them among the expected values.
+        returns = calc_asset_returns(prices)
+        self._asset_expctd_returns_ = calc_asset_expctd_returns(prices=prices, dtype="Series", returns=returns)
+        self._asset_expctd_risks_ = calc_asset_expctd_risks(prices=prices, dtype="Series", returns=returns)
+        self._asset_expctd_corr_cf_ = calc_corr_cf(prices=prices) if corr_cf is None else corr_cf
+        if self._cov_estimator == "ledoit_wolf":
+            self._asset_expctd_corr_cf_ = shrink_corr_cf(self._asset_expctd_corr_cf_, prices, returns=returns)
+        asset_expctd_risks = self._asset_expctd_risks_.to_numpy()
+        self._asset_expctd_cov_ = np.outer(asset_expctd_risks, asset_expctd_risks) * self._asset_expctd_corr_cf_.to_numpy()
         self._crnt_time_ = crnt_time
 
-    def define(self, prices, crnt_time):
+    def define(self, prices, crnt_time, corr_cf=None):
         """Define the problem with the parameters given.
 
         Parameters
@@ -72,14 +95,21 @@ class Problem(object):
         crnt_time : Timestamp
             The current date-time at which the problem is defined.
 
+        corr_cf : DataFrame of shape (num_assets, num_assets) and float, default None
+            The correlation coefficients of the assets calculated in advance, e.g. incrementally over the moving window.
+            If None, they are calculated from the prices.
+
         Returns
         -------
         is_success : bool
             True if the problem is defined properly.
         """
-        self._reset(prices, crnt_time)
-        self._build_abst_model()
-        self._build_cncrt_model()
+        self._reset(prices, crnt_time, corr_cf)
+        # Build the models only once for the number of the assets and just update the parameters of them afterwards.
+        if self._cncrt_model_ is None or len(self._cncrt_model_.set_asset) != self._num_assets_:
+            self._build_abst_model()
+            self._build_cncrt_model()
+        self._update_params()
         is_success = self._validate_model()
         return is_success
 
@@ -89,20 +119,21 @@ class Problem(object):
         model.set_asset = RangeSet(0, self._num_assets_ - 1)
         model.asset_expctd_returns = Param(model.set_asset, mutable=True)
         model.asset_expctd_risks = Param(model.set_asset, mutable=True)
-        model.asset_expctd_corr_cf = Param(model.set_asset, model.set_asset, mutable=True)
+        # Keep only the upper triangle of the symmetric covariances.
+        model.set_asset_pair_upper = Set(
+            dimen=2, initialize=lambda m: [(a, a1) for a in m.set_asset for a1 in m.set_asset if a <= a1]
+        )
+        model.asset_expctd_cov = Param(model.set_asset_pair_upper, mutable=True)
 
         self._abst_model_ = model
 
     def _build_cncrt_model(self):
-        """Build the concrete optimization model based on the abstract one."""
-        model = self._abst_model_.create_instance()
+        """Build the concrete optimization model based on the abstract one.
 
-        # Set constants.
-        for a in model.set_asset:
-            model.asset_expctd_returns[a] = self._asset_expctd_returns_[a]
-            model.asset_expctd_risks[a] = self._asset_expctd_risks_[a]
-            for a1 in model.set_asset:
-                model.asset_expctd_corr_cf[a, a1] = self._asset_expctd_corr_cf_.iloc[a, a1]
+        The constants are left to be set by `_update_params`, since the model is reused for the problems with the same
+        number of the assets.
+        """
+        model = self._abst_model_.create_instance()
 
         # Set variables.
         model.asset_props = Var(model.set_asset, bounds=(0.0, 1.0))
@@ -118,6 +149,44 @@ class Problem(object):
 
         self._cncrt_model_ = model
 
+    def _update_params(self):
+        """Update the constants of the concrete optimization model in bulk with the current parameters."""
+        model = self._cncrt_model_
+        asset_expctd_cov = self._asset_expctd_cov_.tolist()
+        # Skip the validation per element, since the indices are taken from the model's sets and the values are floats.
+        model.asset_expctd_returns.store_values(
+            dict(enumerate(self._asset_expctd_returns_.to_numpy().tolist())), check=False
+        )
+        model.asset_expctd_risks.store_values(
+            dict(enumerate(self._asset_expctd_risks_.to_numpy().tolist())), check=False
+        )
+        model.asset_expctd_cov.store_values(
+            {(a, a1): asset_expctd_cov[a][a1] for a, a1 in model.set_asset_pair_upper}, check=False
+        )
+
+    def _build_prtfl_expctd_var_expr(self, model):
+        """Build the expression of the expected variance of the portfolio.
+
+        The coefficients are the expected covariances of the assets kept as mutable parameters, so that the expression
+        remains valid after the parameters are updated. Since they are symmetric, only the upper triangle is kept and each
+        pair of different assets appears once with a doubled coefficient.
+
+        Parameters
+        ----------
+        model : ConcreteModel
+            The concrete optimization model for the problem.
+
+        Returns
+        -------
+        expr : expression
+            The expected variance of the portfolio.
+        """
+        cov = model.asset_expctd_cov
+        expr = quicksum(cov[a, a] * model.asset_props[a] ** 2 for a in model.set_asset) \
+            + 2.0 * quicksum(cov[a, a1] * model.asset_props[a] * model.asset_props[a1]
+                             for a, a1 in model.set_asset_pair_upper if a < a1)
+        return expr
+
     def _validate_model(self):
         """Validate the model if it is defined properly or not.
 
@@ -140,3 +209,11 @@ class Problem(object):
     @property
     def asset_name_list_(self):
         return self._asset_name_list_
+
+    @property
+    def asset_expctd_returns_(self):
+        return self._asset_expctd_returns_
+
+    @property
+    def asset_expctd_cov_(self):
+        return self._asset_expctd_cov_
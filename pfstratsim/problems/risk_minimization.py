@@ -31,9 +31,6 @@ class RiskMinimization(Problem):
         super()._build_cncrt_model()
         model = self._cncrt_model_
 
-        # Set constants.
-        model.prtfl_expctd_return_lower = np.quantile([value(model.asset_expctd_returns[a]) for a in model.set_asset], self._return_lower_qntl)
-
         # Set an objective.
         expr = model.prtfl_expctd_risk
         sense = minimize
@@ -44,8 +41,12 @@ class RiskMinimization(Problem):
         model.constr_min_prtfl_expctd_return.add(model.prtfl_expctd_return >= model.prtfl_expctd_return_lower)
 
         model.constr_prtfl_expctd_risk = ConstraintList()
-        model.constr_prtfl_expctd_risk.add(model.prtfl_expctd_risk ** 2 >=
-            sum((model.asset_expctd_corr_cf[a, a1] * model.asset_expctd_risks[a] * model.asset_expctd_risks[a1] * model.asset_props[a] * model.asset_props[a1])
-            for a in model.set_asset for a1 in model.set_asset))
+        model.constr_prtfl_expctd_risk.add(model.prtfl_expctd_risk ** 2 >= self._build_prtfl_expctd_var_expr(model))
 
         self._cncrt_model_ = model
+
+    def _update_params(self):
+        """Update the constants of the concrete optimization model in bulk with the current parameters."""
+        super()._update_params()
+        model = self._cncrt_model_
+        model.prtfl_expctd_return_lower = np.quantile(self._asset_expctd_returns_.to_numpy(), self._return_lower_qntl)
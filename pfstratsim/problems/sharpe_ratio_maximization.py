@@ -32,9 +32,7 @@ class SharpeRatioMaximization(Problem):
 
         # Set Constraints.
         model.constr_prtfl_expctd_risk = ConstraintList()
-        model.constr_prtfl_expctd_risk.add(model.prtfl_expctd_risk ** 2 >=
-            sum((model.asset_expctd_corr_cf[a, a1] * model.asset_expctd_risks[a] * model.asset_expctd_risks[a1] * model.asset_props[a] * model.asset_props[a1])
-            for a in model.set_asset for a1 in model.set_asset))
+        model.constr_prtfl_expctd_risk.add(model.prtfl_expctd_risk ** 2 >= self._build_prtfl_expctd_var_expr(model))
 
         self._cncrt_model_ = model
 
@@ -1,5 +1,9 @@
-from .simulation import Simulation
+from .simulation import Simulation, TRIGGER_ALGOS, PROBLEM_CLASSES, SOLVER_ALGOS, OUTPUT_FIELDS
 
 __all__ = [
-    "Simulation"
+    "Simulation",
+    "TRIGGER_ALGOS",
+    "PROBLEM_CLASSES",
+    "SOLVER_ALGOS",
+    "OUTPUT_FIELDS",
 ]
@@ -2,16 +2,48 @@ import os
 import numpy as np
 import pandas as pd
 from datetime import timedelta
-import joblib
 import warnings
+from joblib import Parallel, delayed
 
 from ..problems import RiskMinimization, SharpeRatioMaximization
-from ..solvers import Solver, EqualProportion, MathematicalProgramming
+from ..solvers import Solver, EqualProportion, MathematicalProgramming, QuadraticProgramming, CvxpyProgramming
 from ..triggers import Trigger, RegularBasis, IdenticalDistributionTest
 from ..utils import calc_asset_obsrvd_returns, calc_asset_obsrvd_risks, calc_prtfl_obsrvd_return, calc_prtfl_obsrvd_risk
+from ..utils import calc_asset_obsrvd_returns_from_moments, calc_asset_obsrvd_risks_from_moments
+from ..utils import calc_asset_returns, RollingMoments
+from ..utils import _kernels
+from ..utils import dump_object, write_csv
 
 warnings.filterwarnings("ignore")
 
+# The registries of the algorithms selectable by name for the triggers, the problems and the solvers.
+TRIGGER_ALGOS = {
+    "regular_basis": RegularBasis,
+    "identical_distribution_test": IdenticalDistributionTest,
+}
+PROBLEM_CLASSES = {
+    "risk_minimization": RiskMinimization,
+    "sharpe_ratio_maximization": SharpeRatioMaximization,
+}
+SOLVER_ALGOS = {
+    "equal_proportion": EqualProportion,
+    "mathematical_programming": MathematicalProgramming,
+    "quadratic_programming": QuadraticProgramming,
+    "cvxpy_programming": CvxpyProgramming,
+}
+
+# The fields of the historical data output by the simulation.
+OUTPUT_FIELDS = [
+    "prices",
+    "asset_expctd_returns", "asset_expctd_risks", "asset_expctd_valtns",
+    "prtfl_expctd_return", "prtfl_expctd_risk", "prtfl_expctd_valtn",
+    "asset_obsrvd_returns", "asset_obsrvd_risks", "asset_obsrvd_valtns",
+    "prtfl_obsrvd_return", "prtfl_obsrvd_risk", "prtfl_obsrvd_valtn",
+    "asset_returns", "asset_valtns", "asset_valtns_reblncd", "prtfl_return", "prtfl_valtn", "asset_props",
+    "idntcl_dstrbtn_prob",
+    "prtfl_expctd_value", "prtfl_obsrvd_value",
+]
+
 
 class Simulation(object):
     """The simulation for the portfolio strategy.
@@ -19,13 +51,13 @@ class Simulation(object):
     Parameters
     ----------
     trigger_class : {"regular_basis", "identical_distribution_test"}
-        The class of trigger used in the simulation.
+        The class of trigger used in the simulation, or any other registered in `TRIGGER_ALGOS`.
 
     problem_class : {"risk_minimization", "sharpe_ratio_maximization"}
-        The class of problem used in the simulation.
+        The class of problem used in the simulation, or any other registered in `PROBLEM_CLASSES`.
 
-    solver_class : {"equal_proportion", "mathematical_programming}
-        The class of solver used in the simulation.
+    solver_class : {"equal_proportion", "mathematical_programming", "quadratic_programming", "cvxpy_programming"}
+        The class of solver used in the simulation, or any other registered in `SOLVER_ALGOS`.
 
     prices : DataFrame of shape (num_times, num_assets) and float
         The historical prices of the assets.
@@ -46,7 +78,24 @@ class Simulation(object):
         The minimum interval for rebalancing.
 
     result_dir : str, default "."
-        The output directory for the simulation result.
+        The output directory for the simulation result. The historical data are saved as the Parquet files by the field
+        in "data_history", and those to be read as the CSV files as well. The dump file "data_history" of the former
+        versions, if any, is renamed to "data_history.joblib" to make way for the directory.
+
+    solve_n_jobs : int, default 1
+        The number of the jobs to solve the problems at the rebalancing date-times in parallel. If not 1, the
+        rebalancing date-times are found in advance on the assumption that all the problems are solved, and the problems
+        at them are solved in parallel. The simulation itself goes as it does sequentially, and the assessments and the
+        solutions are made again only where the rebalancings actually fail. The problems solved in parallel are each
+        built and solved from scratch, without the warm start from the previous solution and with the correlation
+        coefficients calculated directly instead of incrementally, so that the results can differ from those with 1 by
+        the tolerances of the solver and the rounding errors, around 1e-7. Worth more than 1 only if each problem takes
+        long enough, e.g. by a global solver of the mathematical programming, to outweigh the costs of the processes,
+        which make it several times slower than 1 for the fast solvers.
+
+    output_fields : list of str, default None
+        The fields of the historical data to be stored and saved, out of `OUTPUT_FIELDS`. If None, all of them are. The
+        observed values are not calculated at all if none of them is output.
 
     params : dict
         The other parameters of the trigger, the problem and the solver.
@@ -59,14 +108,22 @@ class Simulation(object):
     _reblncng_time_list_ : list
         The rebalancing timing list.
 
-    _prtfl_valtn_ : DataFrame of shape (num_times=1, num_prtfls=1) and float
+    _prtfl_valtn_ : float
         The valuation of the portfolio.
 
     _data_history_ : dict
         The stored data history.
     """
     def __init__(self, trigger_class, problem_class, solver_class, prices, start_time, end_time, init_prtfl_valtn=100.0,
-                 window_day=28, min_reblncng_intrvl_day=1, result_dir=".", **params):
+                 window_day=28, min_reblncng_intrvl_day=1, result_dir=".", solve_n_jobs=1,
+                 output_fields=None, **params):
+        _check_registered("trigger_class", trigger_class, TRIGGER_ALGOS)
+        _check_registered("problem_class", problem_class, PROBLEM_CLASSES)
+        _check_registered("solver_class", solver_class, SOLVER_ALGOS)
+        if output_fields is None:
+            output_fields = OUTPUT_FIELDS
+        for output_field in output_fields:
+            _check_registered("output_fields", output_field, dict.fromkeys(OUTPUT_FIELDS))
         self._trigger_class = trigger_class
         self._problem_class = problem_class
         self._solver_class = solver_class
@@ -77,11 +134,13 @@ class Simulation(object):
         self._window_day = window_day
         self._min_reblncng_intrvl_day = min_reblncng_intrvl_day
         self._result_dir = result_dir
+        self._solve_n_jobs = solve_n_jobs
+        self._output_fields = set(output_fields)
         self._params = params
 
         self._prev_prices_ = None
         self._reblncng_time_list_ = []
-        self._prtfl_valtn_ = pd.DataFrame([self._init_prtfl_valtn], index=[self._start_time], columns=["prtfl_valtn"])
+        self._prtfl_valtn_ = self._init_prtfl_valtn
         self._data_history_ = None
 
     def execute(self):
@@ -115,193 +174,519 @@ class Simulation(object):
         else:
             data_history = self._data_history_
 
-        # Set a trigger class and a trigger algorithm class.
-        if self._trigger_class == "regular_basis":
-            trigger = Trigger(RegularBasis(**self._params))
-        elif self._trigger_class == "identical_distribution_test":
-            trigger = Trigger(IdenticalDistributionTest(**self._params))
-        else:
-            message = f"Invalid value for 'self._trigger_class': {self._trigger_class}." \
-                      f"'self._trigger_class' must be in ['regular_basis', 'identical_distribution_test']."
-            raise ValueError(message)
-
-        # Set a problem class.
-        if self._problem_class == "risk_minimization":
-            problem = RiskMinimization(**self._params)
-        elif self._problem_class == "sharpe_ratio_maximization":
-            problem = SharpeRatioMaximization(**self._params)
-        else:
-            message = f"Invalid value for 'self._problem_class': {self._problem_class}." \
-                      f"'self._problem_class' must be in ['risk_minimization', 'sharpe_ratio_maximization']."
-            raise ValueError(message)
-
-        # Set a solver class and a solver algorithm class.
-        if self._solver_class == "equal_proportion":
-            solver = Solver(EqualProportion(**self._params))
-        elif self._solver_class == "mathematical_programming":
-            solver = Solver(MathematicalProgramming(**self._params))
-        else:
-            message = f"Invalid value for 'self._solver_class': {self._solver_class}." \
-                      f"'self._solver_class' must be in ['equal_proportion', 'mathematical_programming']."
-            raise ValueError(message)
+        # Set a trigger, a problem and a solver.
+        trigger = _create_trigger(self._trigger_class, self._params)
+        problem = _create_problem(self._problem_class, self._params)
+        solver = _create_solver(self._solver_class, self._params)
+
+        # Share the Index of the assets among the values built below instead of building it from a list every time.
+        asset_names = self._prices.columns
+        # Buffer the data stored in the loop as pairs of the date-time and the values to build the data frames at once
+        # after the loop.
+        history_columns = {
+            "asset_expctd_returns": asset_names,
+            "asset_expctd_risks": asset_names,
+            "asset_expctd_valtns": asset_names,
+            "prtfl_expctd_return": ["prtfl_expctd_return"],
+            "prtfl_expctd_risk": ["prtfl_expctd_risk"],
+            "prtfl_expctd_valtn": ["prtfl_expctd_valtn"],
+            "asset_obsrvd_returns": asset_names,
+            "asset_obsrvd_risks": asset_names,
+            "asset_obsrvd_valtns": asset_names,
+            "prtfl_obsrvd_return": ["prtfl_obsrvd_return"],
+            "prtfl_obsrvd_risk": ["prtfl_obsrvd_risk"],
+            "prtfl_obsrvd_valtn": ["prtfl_obsrvd_valtn"],
+            "asset_returns": asset_names,
+            "asset_valtns": asset_names,
+            "asset_valtns_reblncd": asset_names,
+            "prtfl_return": ["prtfl_return"],
+            "prtfl_valtn": ["prtfl_valtn"],
+            "asset_props": asset_names,
+            "idntcl_dstrbtn_prob": asset_names,
+        }
+        history_buffer = {key: [] for key in history_columns}
+        # Store the fields the output values are classified from as well.
+        stored_fields = set(self._output_fields)
+        if "prtfl_expctd_value" in stored_fields:
+            stored_fields |= {"prtfl_expctd_return", "prtfl_expctd_risk", "prtfl_expctd_valtn"}
+        if "prtfl_obsrvd_value" in stored_fields:
+            stored_fields |= {"prtfl_obsrvd_return", "prtfl_obsrvd_risk", "prtfl_obsrvd_valtn"}
+        is_obsrvd_stored = any("obsrvd" in key for key in stored_fields)
 
         # Set objects for the simulation.
         prev_prices = self._prev_prices_
         reblncng_time_list = []
         prtfl_valtn = self._prtfl_valtn_
-        window = timedelta(days=self._window_day)
-        crnt_time = self._start_time
+        times = self._prices.index
+        time_pos = {time: pos for pos, time in enumerate(times)}
+        next_pos, end_pos, next_pos_list, oldest_pos_list = self._locate_positions()
+        crnt_pos = None
+        rolling_moments = RollingMoments(self._prices)
+        # Keep the prices as an array to slice them by position without pandas where they have no missing values.
+        prices_arr = self._prices.to_numpy(dtype=np.float64)
+        is_prices_complete = not np.isnan(prices_arr).any()
+        # Keep the prefix sums of the returns and their squares to calculate the observed values of the assets over any
+        # period by the differences at its ends.
+        if is_prices_complete:
+            returns_arr = _kernels.calc_returns(prices_arr)
+            return_prefix_sums = np.vstack([np.zeros(len(asset_names)), np.cumsum(returns_arr, axis=0)])
+            # Shift the returns by the first ones for the risks, which the variances don't depend on, so that the large
+            # sums don't cancel out to errors and the risks of the assets with constant returns such as cash are exactly
+            # 0.
+            shifted_returns_arr = returns_arr - returns_arr[:1]
+            shifted_return_prefix_sums = np.vstack(
+                [np.zeros(len(asset_names)), np.cumsum(shifted_returns_arr, axis=0)]
+            )
+            shifted_return_square_prefix_sums = np.vstack(
+                [np.zeros(len(asset_names)), np.cumsum(shifted_returns_arr ** 2, axis=0)]
+            )
+        reblncng_pos = None
+        # Assess and solve at the rebalancing date-times found in advance in parallel, which are looked up in the loop
+        # by the current position, and also by the position of the last rebalancing for the assessments.
+        if self._solve_n_jobs == 1:
+            assessments, solutions = {}, {}
+        else:
+            assessments, solutions = self._assess_and_solve_in_advance(trigger)
         # Execute the simulation.
-        while crnt_time <= self._end_time:
-            # Ignore date-times that are not included in the prices' date-times.
-            if not crnt_time in self._prices.index:
-                crnt_time += timedelta(days=1)
-                continue
+        while next_pos < end_pos:
+            # Step over the positions of the prices' date-times instead of the date-times day by day.
+            crnt_pos = next_pos
+            crnt_time = times[crnt_pos]
+            next_pos = next_pos_list[crnt_pos]
             # Extract the price data in the moving window from the current date-time
-            oldest_time = crnt_time - window
-            crnt_prices = self._prices[oldest_time:crnt_time]
+            oldest_pos = oldest_pos_list[crnt_pos]
+            crnt_prices = self._prices.iloc[oldest_pos:crnt_pos + 1]
 
             # Assess the necessity of rebalancing and store the identical distribution probabilities.
-            is_reblncng, idntcl_dstrbtn_prob = trigger.assess(
-                crnt_time=crnt_time,
-                crnt_prices=crnt_prices,
-                prev_prices=prev_prices,
-                reblncng_time_list=reblncng_time_list
-            )
-            data_history["idntcl_dstrbtn_prob"] = pd.concat([data_history["idntcl_dstrbtn_prob"], idntcl_dstrbtn_prob], axis=0)
+            if (crnt_pos, reblncng_pos) in assessments:
+                is_reblncng, idntcl_dstrbtn_prob = assessments[(crnt_pos, reblncng_pos)]
+            else:
+                is_reblncng, idntcl_dstrbtn_prob = trigger.assess(
+                    crnt_time=crnt_time,
+                    crnt_prices=crnt_prices,
+                    prev_prices=prev_prices,
+                    reblncng_time_list=reblncng_time_list
+                )
+            if idntcl_dstrbtn_prob is not None:
+                history_buffer["idntcl_dstrbtn_prob"].append((crnt_time, idntcl_dstrbtn_prob.to_numpy()[0]))
 
             if is_reblncng:
                 print(f"*** {crnt_time} ***")
-                # Define a problem at the current date-time and solve the problem.
-                is_success = problem.define(crnt_prices, crnt_time)
-                if is_success:
-                    # Calculate the asset proportions and the asset valuations after rebalancing and store them.
-                    is_success = solver.solve(problem, **self._params)
-                    if is_success:
-                        asset_valtns_reblncd = prtfl_valtn.iloc[0, 0] * solver.asset_props_
-                        data_history["asset_props"] = pd.concat([data_history["asset_props"], solver.asset_props_], axis=0)
-                        data_history["asset_valtns_reblncd"] = pd.concat([data_history["asset_valtns_reblncd"], asset_valtns_reblncd], axis=0)
-
-                        # Store and back up some information for the next date-time.
-                        if len(reblncng_time_list) > 0:
-                            prev_reblncng_time = reblncng_time_list[-1]
-                        else:
-                            prev_reblncng_time = None
-                        reblncng_time_list.append(crnt_time)
-                        prev_prices = crnt_prices.copy()
-                        prev_asset_valtns = asset_valtns_reblncd.copy()
-                        prev_prtfl_valtn = prtfl_valtn.copy()
-                    else:
-                        crnt_time += timedelta(days=self._min_reblncng_intrvl_day)
-                        continue
+                if crnt_pos in solutions:
+                    solution = solutions[crnt_pos]
                 else:
-                    crnt_time += timedelta(days=self._min_reblncng_intrvl_day)
+                    # Update the moments of the prices in the moving window and calculate the correlation
+                    # coefficients from them.
+                    corr_cf = None
+                    if rolling_moments.is_updatable_:
+                        rolling_moments.update(oldest_pos, crnt_pos + 1)
+                        corr_cf = rolling_moments.calc_corr_cf()
+                    # Define a problem at the current date-time and solve the problem.
+                    solution = _solve(problem, solver, crnt_prices, crnt_time, corr_cf, self._params)
+                if solution is None:
                     continue
+                (asset_props_arr, asset_expctd_returns_arr, asset_expctd_risks_arr,
+                 prtfl_expctd_return_arr, prtfl_expctd_risk_arr) = solution
+                asset_props = pd.DataFrame(asset_props_arr[np.newaxis, :], index=[crnt_time], columns=asset_names)
+
+                # Calculate the asset valuations after rebalancing and store them with the asset proportions.
+                asset_valtns_reblncd = prtfl_valtn * asset_props_arr
+                history_buffer["asset_props"].append((crnt_time, asset_props_arr))
+                history_buffer["asset_valtns_reblncd"].append((crnt_time, asset_valtns_reblncd))
+
+                # Store and back up some information for the next date-time.
+                if len(reblncng_time_list) > 0:
+                    prev_reblncng_time = reblncng_time_list[-1]
+                else:
+                    prev_reblncng_time = None
+                reblncng_time_list.append(crnt_time)
+                reblncng_pos = crnt_pos
+                prev_prices = crnt_prices
+                prev_asset_valtns = asset_valtns_reblncd
+                prev_asset_valtns_sum = prev_asset_valtns.sum()
+                prev_prtfl_valtn = prtfl_valtn
 
             # Calculate expected values and store them.
-            # For the assets
-            asset_expctd_valtns = pd.DataFrame(np.array(asset_valtns_reblncd) * np.array(1 + solver.asset_expctd_returns_), index=solver.asset_expctd_returns_.index, columns=solver.asset_expctd_returns_.columns)
-            data_history["asset_expctd_returns"] = pd.concat([data_history["asset_expctd_returns"], solver.asset_expctd_returns_], axis=0)
-            data_history["asset_expctd_risks"] = pd.concat([data_history["asset_expctd_risks"], solver.asset_expctd_risks_], axis=0)
-            data_history["asset_expctd_valtns"] = pd.concat([data_history["asset_expctd_valtns"], asset_expctd_valtns], axis=0)
-            data_history["asset_expctd_returns"] = edit_index(data_history["asset_expctd_returns"], -1, crnt_time)
-            data_history["asset_expctd_risks"] = edit_index(data_history["asset_expctd_risks"], -1, crnt_time)
-            data_history["asset_expctd_valtns"] = edit_index(data_history["asset_expctd_valtns"], -1, crnt_time)
+            # For the assets, with the valuations built in a single array
+            asset_expctd_valtns = asset_expctd_returns_arr + 1.0
+            asset_expctd_valtns *= asset_valtns_reblncd
+            history_buffer["asset_expctd_returns"].append((crnt_time, asset_expctd_returns_arr))
+            history_buffer["asset_expctd_risks"].append((crnt_time, asset_expctd_risks_arr))
+            history_buffer["asset_expctd_valtns"].append((crnt_time, asset_expctd_valtns))
             # For the portfolio
-            prtfl_expctd_valtn = pd.DataFrame(np.array(prev_prtfl_valtn) * np.array(1 + solver.prtfl_expctd_return_), index=solver.prtfl_expctd_return_.index, columns=["prtfl_expctd_valtn"])
-            data_history["prtfl_expctd_return"] = pd.concat([data_history["prtfl_expctd_return"], solver.prtfl_expctd_return_], axis=0)
-            data_history["prtfl_expctd_risk"] = pd.concat([data_history["prtfl_expctd_risk"], solver.prtfl_expctd_risk_], axis=0)
-            data_history["prtfl_expctd_valtn"] = pd.concat([data_history["prtfl_expctd_valtn"], prtfl_expctd_valtn], axis=0)
-            data_history["prtfl_expctd_return"] = edit_index(data_history["prtfl_expctd_return"], -1, crnt_time)
-            data_history["prtfl_expctd_risk"] = edit_index(data_history["prtfl_expctd_risk"], -1, crnt_time)
-            data_history["prtfl_expctd_valtn"] = edit_index(data_history["prtfl_expctd_valtn"], -1, crnt_time)
-
-            # Calculate the observed values and store them.
+            prtfl_expctd_valtn = prev_prtfl_valtn * (1.0 + prtfl_expctd_return_arr)
+            history_buffer["prtfl_expctd_return"].append((crnt_time, prtfl_expctd_return_arr))
+            history_buffer["prtfl_expctd_risk"].append((crnt_time, prtfl_expctd_risk_arr))
+            history_buffer["prtfl_expctd_valtn"].append((crnt_time, prtfl_expctd_valtn))
+
             # For the fist time of rebalancing
             if prev_reblncng_time is None:
-                crnt_time += timedelta(days=self._min_reblncng_intrvl_day)
                 continue
             # Common setting
-            prev_crnt_prices = self._prices[prev_reblncng_time:crnt_time]
-            if len(prev_crnt_prices) <= 2:
-                message = f"With the number of price data ({len(prev_crnt_prices)}) less than or equal to 2, the" \
-                           "return covariances cannot be calculated. This causes failures in calculation of the" \
-                           "observed risks for the assets and the portfolio."
-                warnings.warn(message)
-            kwargs = {"prices": prev_crnt_prices, "index": [crnt_time]}
-            # For the assets
-            asset_obsrvd_returns = calc_asset_obsrvd_returns(**kwargs)
-            asset_obsrvd_risks = calc_asset_obsrvd_risks(**kwargs)
-            asset_obsrvd_valtns = pd.DataFrame(np.array(prev_asset_valtns) * np.array(1 + asset_obsrvd_returns), index=[crnt_time], columns=prev_asset_valtns.columns)
-            data_history["asset_obsrvd_returns"] = pd.concat([data_history["asset_obsrvd_returns"], asset_obsrvd_returns], axis=0)
-            data_history["asset_obsrvd_risks"] = pd.concat([data_history["asset_obsrvd_risks"], asset_obsrvd_risks], axis=0)
-            data_history["asset_obsrvd_valtns"] = pd.concat([data_history["asset_obsrvd_valtns"], asset_obsrvd_valtns], axis=0)
-            # For the portfolio
-            prtfl_obsrvd_return = calc_prtfl_obsrvd_return(asset_props=solver.asset_props_, columns=["prtfl_obsrvd_return"], **kwargs)
-            prtfl_obsrvd_risk = calc_prtfl_obsrvd_risk(asset_props=solver.asset_props_, columns=["prtfl_obsrvd_risk"], **kwargs)
-            prtfl_obsrvd_valtn = pd.DataFrame(np.array(prev_prtfl_valtn) * np.array(1 + prtfl_obsrvd_return), index=[crnt_time], columns=["prtfl_obsrvd_valtn"])
-            data_history["prtfl_obsrvd_return"] = pd.concat([data_history["prtfl_obsrvd_return"], prtfl_obsrvd_return], axis=0)
-            data_history["prtfl_obsrvd_risk"] = pd.concat([data_history["prtfl_obsrvd_risk"], prtfl_obsrvd_risk], axis=0)
-            data_history["prtfl_obsrvd_valtn"] = pd.concat([data_history["prtfl_obsrvd_valtn"], prtfl_obsrvd_valtn], axis=0)
+            prev_crnt_prices = self._prices.iloc[time_pos[prev_reblncng_time]:crnt_pos + 1]
+
+            # Calculate the observed values and store them if any of them is output.
+            if is_obsrvd_stored:
+                if len(prev_crnt_prices) <= 2:
+                    message = f"With the number of price data ({len(prev_crnt_prices)}) less than or equal to 2, the" \
+                               "return covariances cannot be calculated. This causes failures in calculation of the" \
+                               "observed risks for the assets and the portfolio."
+                    warnings.warn(message)
+                # For the assets
+                if is_prices_complete:
+                    prev_pos = time_pos[prev_reblncng_time]
+                    num_returns = crnt_pos - prev_pos
+                    return_sums = return_prefix_sums[crnt_pos] - return_prefix_sums[prev_pos]
+                    shifted_return_sums = shifted_return_prefix_sums[crnt_pos] - shifted_return_prefix_sums[prev_pos]
+                    shifted_return_square_sums = \
+                        shifted_return_square_prefix_sums[crnt_pos] - shifted_return_square_prefix_sums[prev_pos]
+                    kwargs = {"prices": prev_crnt_prices}
+                    asset_obsrvd_returns = calc_asset_obsrvd_returns_from_moments(
+                        num_returns, return_sums, dtype="Series", columns=asset_names
+                    )
+                    asset_obsrvd_risks = calc_asset_obsrvd_risks_from_moments(
+                        num_returns, shifted_return_sums, shifted_return_square_sums, dtype="Series", columns=asset_names
+                    )
+                else:
+                    # Calculate the returns once to share them among the observed values.
+                    kwargs = {"prices": prev_crnt_prices, "returns": calc_asset_returns(prev_crnt_prices)}
+                    asset_obsrvd_returns = calc_asset_obsrvd_returns(dtype="Series", **kwargs)
+                    asset_obsrvd_risks = calc_asset_obsrvd_risks(dtype="Series", **kwargs)
+                asset_obsrvd_returns_arr = asset_obsrvd_returns.to_numpy()
+                asset_obsrvd_valtns = asset_obsrvd_returns_arr + 1.0
+                asset_obsrvd_valtns *= prev_asset_valtns
+                history_buffer["asset_obsrvd_returns"].append((crnt_time, asset_obsrvd_returns_arr))
+                history_buffer["asset_obsrvd_risks"].append((crnt_time, asset_obsrvd_risks.to_numpy()))
+                history_buffer["asset_obsrvd_valtns"].append((crnt_time, asset_obsrvd_valtns))
+                # For the portfolio
+                prtfl_obsrvd_return = calc_prtfl_obsrvd_return(
+                    asset_props=asset_props, asset_obsrvd_returns=asset_obsrvd_returns, **kwargs
+                ).to_numpy()[0]
+                prtfl_obsrvd_risk = calc_prtfl_obsrvd_risk(
+                    asset_props=asset_props, asset_obsrvd_risks=asset_obsrvd_risks, **kwargs
+                ).to_numpy()[0]
+                prtfl_obsrvd_valtn = prev_prtfl_valtn * (1.0 + prtfl_obsrvd_return)
+                history_buffer["prtfl_obsrvd_return"].append((crnt_time, prtfl_obsrvd_return))
+                history_buffer["prtfl_obsrvd_risk"].append((crnt_time, prtfl_obsrvd_risk))
+                history_buffer["prtfl_obsrvd_valtn"].append((crnt_time, prtfl_obsrvd_valtn))
 
             # Calculate performance and store them.
             # For the assets
-            asset_returns = calc_asset_obsrvd_returns(prices=prev_crnt_prices.iloc[[0, -1], :], frequency=1, index=[crnt_time])
-            asset_valtns = pd.DataFrame(np.array(prev_asset_valtns) * np.array(1 + asset_returns), index=[crnt_time], columns=prev_asset_valtns.columns)
-            data_history["asset_returns"] = pd.concat([data_history["asset_returns"], asset_returns], axis=0)
-            data_history["asset_valtns"] = pd.concat([data_history["asset_valtns"], asset_valtns], axis=0)
+            if is_prices_complete:
+                asset_returns = prices_arr[crnt_pos] / prices_arr[time_pos[prev_reblncng_time]] - 1.0
+            else:
+                asset_returns = calc_asset_obsrvd_returns(prices=prev_crnt_prices.iloc[[0, -1], :], frequency=1, dtype="Series").to_numpy()
+            asset_valtns = asset_returns + 1.0
+            asset_valtns *= prev_asset_valtns
+            history_buffer["asset_returns"].append((crnt_time, asset_returns))
+            history_buffer["asset_valtns"].append((crnt_time, asset_valtns))
             # For the portfolio
-            #prtfl_return = pd.DataFrame([(np.array(prev_asset_valtns) * np.array(asset_returns)).sum().sum() / prev_asset_valtns.sum().sum()], index=[crnt_time], columns=["prtfl_return"])
-            prtfl_return = pd.DataFrame([(asset_valtns.sum().sum() - prev_asset_valtns.sum().sum()) / prev_asset_valtns.sum().sum()], index=[crnt_time], columns=["prtfl_return"])
-            prtfl_valtn = pd.DataFrame(np.array(prev_prtfl_valtn) * np.array(1 + prtfl_return), index=[crnt_time], columns=prtfl_valtn.columns)
-            data_history["prtfl_return"] = pd.concat([data_history["prtfl_return"], prtfl_return], axis=0)
-            data_history["prtfl_valtn"] = pd.concat([data_history["prtfl_valtn"], prtfl_valtn], axis=0)
+            prtfl_return = (asset_valtns.sum() - prev_asset_valtns_sum) / prev_asset_valtns_sum
+            prtfl_valtn = prev_prtfl_valtn * (1.0 + prtfl_return)
+            history_buffer["prtfl_return"].append((crnt_time, prtfl_return))
+            history_buffer["prtfl_valtn"].append((crnt_time, prtfl_valtn))
+
+        # Set the date-time following the end time as the day-by-day stepping over the date-times would.
+        if crnt_pos is None:
+            next_time = self._start_time
+        else:
+            next_time = times[crnt_pos] + timedelta(days=self._min_reblncng_intrvl_day)
+        if next_time <= self._end_time:
+            next_time += ((self._end_time - next_time) // timedelta(days=1) + 1) * timedelta(days=1)
 
-            crnt_time += timedelta(days=self._min_reblncng_intrvl_day)
+        # Build the data frames from the data stored in the loop and append them to the stored ones.
+        for key, columns in history_columns.items():
+            if key not in stored_fields or len(history_buffer[key]) == 0:
+                continue
+            data = pd.DataFrame(
+                np.reshape([values for _, values in history_buffer[key]], (-1, len(columns))),
+                index=[time for time, _ in history_buffer[key]], columns=columns
+            )
+            data_history[key] = pd.concat([data_history[key], data], axis=0)
 
         # Classify historical data to expected value and observed value.
         # For expected value
-        data_history["prtfl_expctd_value"] = pd.DataFrame()
-        data_history["prtfl_expctd_value"]["valtn"] = data_history["prtfl_expctd_valtn"]["prtfl_expctd_valtn"]
-        data_history["prtfl_expctd_value"]["return"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"]
-        data_history["prtfl_expctd_value"]["lower"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"] - data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
-        data_history["prtfl_expctd_value"]["upper"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"] + data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
-        data_history["prtfl_expctd_value"]["risk"] = data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
-        data_history["prtfl_expctd_value"]["sharpe_ratio"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"] / data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
+        if "prtfl_expctd_value" in stored_fields:
+            data_history["prtfl_expctd_value"] = pd.DataFrame()
+            data_history["prtfl_expctd_value"]["valtn"] = data_history["prtfl_expctd_valtn"]["prtfl_expctd_valtn"]
+            data_history["prtfl_expctd_value"]["return"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"]
+            data_history["prtfl_expctd_value"]["lower"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"] - data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
+            data_history["prtfl_expctd_value"]["upper"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"] + data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
+            data_history["prtfl_expctd_value"]["risk"] = data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
+            data_history["prtfl_expctd_value"]["sharpe_ratio"] = data_history["prtfl_expctd_return"]["prtfl_expctd_return"] / data_history["prtfl_expctd_risk"]["prtfl_expctd_risk"]
         # For observed value
-        data_history["prtfl_obsrvd_value"] = pd.DataFrame()
-        data_history["prtfl_obsrvd_value"]["valtn"] = data_history["prtfl_obsrvd_valtn"]["prtfl_obsrvd_valtn"]
-        data_history["prtfl_obsrvd_value"]["return"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"]
-        data_history["prtfl_obsrvd_value"]["lower"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"] - data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
-        data_history["prtfl_obsrvd_value"]["upper"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"] + data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
-        data_history["prtfl_obsrvd_value"]["risk"] = data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
-        data_history["prtfl_obsrvd_value"]["sharpe_ratio"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"] / data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
+        if "prtfl_obsrvd_value" in stored_fields:
+            data_history["prtfl_obsrvd_value"] = pd.DataFrame()
+            data_history["prtfl_obsrvd_value"]["valtn"] = data_history["prtfl_obsrvd_valtn"]["prtfl_obsrvd_valtn"]
+            data_history["prtfl_obsrvd_value"]["return"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"]
+            data_history["prtfl_obsrvd_value"]["lower"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"] - data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
+            data_history["prtfl_obsrvd_value"]["upper"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"] + data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
+            data_history["prtfl_obsrvd_value"]["risk"] = data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
+            data_history["prtfl_obsrvd_value"]["sharpe_ratio"] = data_history["prtfl_obsrvd_return"]["prtfl_obsrvd_return"] / data_history["prtfl_obsrvd_risk"]["prtfl_obsrvd_risk"]
 
         # Save the historical data.
         # Directory preparing
-        if not os.path.exists(f"{self._result_dir}"):
-            os.makedirs(f"{self._result_dir}")
-        # As dump file
-        joblib.dump(data_history, os.path.join(self._result_dir, "data_history"))
+        os.makedirs(self._result_dir, exist_ok=True)
+        # As Parquet files by the key, which are written and read column by column much faster than the dump file
+        history_dir = os.path.join(self._result_dir, "data_history")
+        if os.path.isfile(history_dir):
+            # Keep the dump file written by the former versions under another name instead of deleting it.
+            legacy_file_path = f"{history_dir}.joblib"
+            message = f"The dump file '{history_dir}' of the former versions was renamed to '{legacy_file_path}' to " \
+                      f"save the historical data as the Parquet files in the directory of the same name."
+            print(message)  # printed since the warnings are ignored in this module
+            os.replace(history_dir, legacy_file_path)
+        os.makedirs(history_dir, exist_ok=True)
+        for key in OUTPUT_FIELDS:
+            file_path = os.path.join(history_dir, f"{key}.parquet")
+            if key in stored_fields:
+                data_history[key].to_parquet(file_path, engine="pyarrow", compression="zstd")
+            elif os.path.isfile(file_path):
+                os.remove(file_path)  # the stale one stored by an earlier simulation with the other fields
         # As CSV file
-        data_history["asset_expctd_returns"].to_csv(os.path.join(self._result_dir, "asset_expected_returns_history.csv"))
-        data_history["asset_obsrvd_returns"].to_csv(os.path.join(self._result_dir, "asset_obsrvd_returns_history.csv"))
-        data_history["asset_returns"].to_csv(os.path.join(self._result_dir, "asset_returns_history.csv"))
-        data_history["prtfl_return"].to_csv(os.path.join(self._result_dir, "portfolio_return_history.csv"))
-        data_history["asset_props"].to_csv(os.path.join(self._result_dir, "asset_proportion_history.csv"))
-        data_history["idntcl_dstrbtn_prob"].to_csv(os.path.join(self._result_dir, "identical_distribution_probability_history.csv"))
+        csv_file_names = {
+            "asset_expctd_returns": "asset_expected_returns_history.csv",
+            "asset_obsrvd_returns": "asset_obsrvd_returns_history.csv",
+            "asset_returns": "asset_returns_history.csv",
+            "prtfl_return": "portfolio_return_history.csv",
+            "asset_props": "asset_proportion_history.csv",
+            "idntcl_dstrbtn_prob": "identical_distribution_probability_history.csv",
+        }
+        for key, file_name in csv_file_names.items():
+            file_path = os.path.join(self._result_dir, file_name)
+            if key in stored_fields:
+                write_csv(data_history[key], file_path)
+            elif os.path.isfile(file_path):
+                os.remove(file_path)  # the stale one stored by an earlier simulation with the other fields
 
         # Update the simulation information to be used in the next simulation.
-        self._start_time = crnt_time
-        self._prtfl_valtn_ = prtfl_valtn.iloc[0, 0]
+        self._start_time = next_time
+        self._prtfl_valtn_ = prtfl_valtn
         self._prev_prices_ = prev_prices
         self._reblncng_time_list_ = reblncng_time_list
         self._data_history_ = data_history
-        joblib.dump(self, os.path.join(self._result_dir, "sim"))
+        dump_object(self, os.path.join(self._result_dir, "sim"))
+
+    def _locate_positions(self):
+        """Locate the positions of the date-times stepped over in the simulation in the prices' date-times at once.
+
+        Returns
+        -------
+        start_pos : int
+            The position of the first date-time from the start time.
+
+        end_pos : int
+            The position following the last date-time up to the end time.
+
+        next_pos_list : list of int
+            The positions of the first date-times after the minimum rebalancing interval from each date-time.
+
+        oldest_pos_list : list of int
+            The positions of the oldest date-times in the moving windows up to each date-time.
+        """
+        times = self._prices.index
+        start_pos = int(times.searchsorted(self._start_time))
+        end_pos = int(times.searchsorted(self._end_time, side="right"))
+        next_pos_list = times.searchsorted(times + timedelta(days=self._min_reblncng_intrvl_day)).tolist()
+        oldest_pos_list = times.searchsorted(times - timedelta(days=self._window_day)).tolist()
+        return start_pos, end_pos, next_pos_list, oldest_pos_list
+
+    def _assess_and_solve_in_advance(self, trigger):
+        """Assess the necessity of rebalancing on the assumption that all the rebalancings succeed, and solve the
+        problems at the rebalancing date-times found in parallel.
+
+        Parameters
+        ----------
+        trigger : Trigger
+            The trigger to determine the rebalancing timings.
+
+        Returns
+        -------
+        assessments : dict
+            The necessities of rebalancing and the identical distribution probabilities keyed by the pairs of the
+            current position and the position of the last rebalancing, None before the first one.
+
+        solutions : dict
+            The solutions of the problems keyed by the positions of the rebalancing date-times, None if failed.
+        """
+        prev_prices = self._prev_prices_
+        reblncng_time_list = []
+        reblncng_pos = None
+        times = self._prices.index
+        next_pos, end_pos, next_pos_list, oldest_pos_list = self._locate_positions()
+        assessments = {}
+        reblncng_windows = []
+        while next_pos < end_pos:
+            crnt_pos = next_pos
+            crnt_time = times[crnt_pos]
+            next_pos = next_pos_list[crnt_pos]
+            oldest_pos = oldest_pos_list[crnt_pos]
+            crnt_prices = self._prices.iloc[oldest_pos:crnt_pos + 1]
+
+            assessments[(crnt_pos, reblncng_pos)] = trigger.assess(
+                crnt_time=crnt_time,
+                crnt_prices=crnt_prices,
+                prev_prices=prev_prices,
+                reblncng_time_list=reblncng_time_list
+            )
+            if assessments[(crnt_pos, reblncng_pos)][0]:
+                reblncng_windows.append((oldest_pos, crnt_pos))
+                reblncng_time_list.append(crnt_time)
+                reblncng_pos = crnt_pos
+                prev_prices = crnt_prices
+
+        solution_list = Parallel(n_jobs=self._solve_n_jobs)(
+            delayed(_create_and_solve)(
+                self._problem_class, self._solver_class, self._prices.iloc[oldest_pos:crnt_pos + 1], times[crnt_pos],
+                self._params
+            )
+            for oldest_pos, crnt_pos in reblncng_windows
+        )
+        solutions = {crnt_pos: solution for (_, crnt_pos), solution in zip(reblncng_windows, solution_list)}
+        return assessments, solutions
+
+
+def _check_registered(name, value, registry):
+    """Check that the name of the class is registered.
+
+    Parameters
+    ----------
+    name : str
+        The name of the argument.
 
+    value : str
+        The name of the class.
+
+    registry : dict
+        The classes registered by their names.
+    """
+    if value not in registry:
+        message = f"Invalid value for '{name}': {value}." \
+                  f"'{name}' must be in {list(registry)}."
+        raise ValueError(message)
+
+
+def _create_trigger(trigger_class, params):
+    """Create the trigger of the class given.
+
+    Parameters
+    ----------
+    trigger_class : str
+        The class of trigger registered in `TRIGGER_ALGOS`, which is validated by `Simulation`.
+
+    params : dict
+        The parameters of the trigger.
+
+    Returns
+    -------
+    trigger : Trigger
+        The trigger to determine the rebalancing timings.
+    """
+    return Trigger(TRIGGER_ALGOS[trigger_class](**params))
 
-def edit_index(data, edited_index, date_time):
-    index = list(data.index)
-    index[edited_index] = pd.to_datetime(date_time)
-    data.index = index
-    return data
+
+def _create_problem(problem_class, params):
+    """Create the problem of the class given.
+
+    Parameters
+    ----------
+    problem_class : str
+        The class of problem registered in `PROBLEM_CLASSES`, which is validated by `Simulation`.
+
+    params : dict
+        The parameters of the problem.
+
+    Returns
+    -------
+    problem : RiskMinimization or SharpeRatioMaximization
+        The optimization problem to determine the asset proportions.
+    """
+    return PROBLEM_CLASSES[problem_class](**params)
+
+
+def _create_solver(solver_class, params):
+    """Create the solver of the class given.
+
+    Parameters
+    ----------
+    solver_class : str
+        The class of solver registered in `SOLVER_ALGOS`, which is validated by `Simulation`.
+
+    params : dict
+        The parameters of the solver.
+
+    Returns
+    -------
+    solver : Solver
+        The solver to determine the asset proportions.
+    """
+    return Solver(SOLVER_ALGOS[solver_class](**params))
+
+
+def _solve(problem, solver, prices, crnt_time, corr_cf, params):
+    """Define the problem at the current date-time and solve it.
+
+    Parameters
+    ----------
+    problem : RiskMinimization or SharpeRatioMaximization
+        The optimization problem to determine the asset proportions.
+
+    solver : Solver
+        The solver to determine the asset proportions.
+
+    prices : DataFrame of shape (num_times, num_assets) and float
+        The historical prices of the assets in the moving window.
+
+    crnt_time : Timestamp
+        The current date-time at which the problem is defined.
+
+    corr_cf : DataFrame of shape (num_assets, num_assets) and float or None
+        The correlation coefficients of the assets calculated in advance. If None, they are calculated from the prices.
+
+    params : dict
+        The parameters of the solver.
+
+    Returns
+    -------
+    solution : tuple of ndarray or None
+        The asset proportions, the expected returns and risks of the assets and the expected return and risk of the
+        portfolio. None if the problem is not defined or solved properly.
+    """
+    if not problem.define(prices, crnt_time, corr_cf=corr_cf):
+        return None
+    if not solver.solve(problem, **params):
+        return None
+    return (
+        solver.asset_props_arr_, solver.asset_expctd_returns_arr_, solver.asset_expctd_risks_arr_,
+        solver.prtfl_expctd_return_arr_, solver.prtfl_expctd_risk_arr_,
+    )
+
+
+def _create_and_solve(problem_class, solver_class, prices, crnt_time, params):
+    """Create the problem and the solver, and define and solve the problem at the current date-time in a job.
+
+    Parameters
+    ----------
+    problem_class : {"risk_minimization", "sharpe_ratio_maximization"}
+        The class of problem.
+
+    solver_class : {"equal_proportion", "mathematical_programming", "quadratic_programming", "cvxpy_programming"}
+        The class of solver.
+
+    prices : DataFrame of shape (num_times, num_assets) and float
+        The historical prices of the assets in the moving window.
+
+    crnt_time : Timestamp
+        The current date-time at which the problem is defined.
+
+    params : dict
+        The parameters of the problem and the solver.
+
+    Returns
+    -------
+    solution : tuple of ndarray or None
+        The solution returned by `_solve`.
+    """
+    problem = _create_problem(problem_class, params)
+    solver = _create_solver(solver_class, params)
+    return _solve(problem, solver, prices, crnt_time, None, params)
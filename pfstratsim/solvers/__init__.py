@@ -1,9 +1,13 @@
 from .solver import Solver
 from .equal_proportion import EqualProportion
 from .mathematical_programming import MathematicalProgramming
+from .quadratic_programming import QuadraticProgramming
+from .cvxpy_programming import CvxpyProgramming
 
 __all__ = [
     "Solver",
     "EqualProportion",
     "MathematicalProgramming",
+    "QuadraticProgramming",
+    "CvxpyProgramming",
 ]
@@ -0,0 +1,214 @@
+import numpy as np
+import time
+from pyomo.environ import *
+
+from .solver_interface import SolverInterface
+from .quadratic_programming import _select_max_sharpe_ratio_asset
+from ..problems import RiskMinimization, SharpeRatioMaximization
+
+# CVXPY, imported on the first construction of the solver since importing it is costly
+cp = None
+
+
+class CvxpyProgramming(SolverInterface):
+    """The solver algorithm using the parameterized programming of CVXPY.
+
+    This is a concrete class on the strategy pattern for solver algorithms.
+
+    The problem is formulated as a CVXPY problem whose data, the expected returns, the factor of the expected
+    covariances and the lower bound of the expected return of the portfolio, are CVXPY parameters. The CVXPY problem is
+    built and compiled once for the type of the problem and the number of the assets, and the next problems only set
+    the values of the parameters and are solved by OSQP from the previous solution. The Sharpe ratio maximization is
+    solved through the problem that minimizes the risk of the portfolio scaled to an expected return of 1, which is
+    equivalent only if any of the assets has a positive expected return. Otherwise, the asset with the highest Sharpe
+    ratio is selected as `QuadraticProgramming` does. The solution is written back to the Pyomo model.
+
+    Parameters
+    ----------
+    params : dict
+        The parameters not to be used in this class but necessary just to realize the API that can call the constructor
+        of all the solver algorithm by one way.
+    """
+    def __init__(self, **params):
+        _import_cvxpy()
+        self._cvx_problem = None
+        self._problem_key = None
+        self._asset_props = None
+        self._asset_expctd_returns = None
+        self._cov_factor = None
+        self._prtfl_expctd_return_lower = None
+
+    def solve(self, problem, is_print=False, tee=False, max_time_limit=-1, **params):
+        """Solve the problem given.
+
+        Parameters
+        ----------
+        problem : RiskMinimization or SharpeRatioMaximization
+            The optimization problem to determine the asset proportions.
+
+        is_print : bool, default False
+            The option whether to output the result summary.
+
+        tee : bool, default False
+            The option whether to output the progress of the optimization process.
+
+        max_time_limit : int, default=-1
+            The time to abort the solution process. If not positive, the time is not limited.
+
+        params : dict
+            The parameters not to be used in this class but necessary just to realize the API that can call this method
+            of all the solver algorithm by one way.
+
+        Returns
+        -------
+        is_success : bool
+            True if the problem is solved properly.
+        """
+        model = problem.cncrt_model_
+        asset_expctd_returns = problem.asset_expctd_returns_.to_numpy()
+        asset_expctd_cov = problem.asset_expctd_cov_
+        num_assets = len(asset_expctd_returns)
+
+        if not isinstance(problem, (RiskMinimization, SharpeRatioMaximization)):
+            message = f"Invalid type for 'problem': {type(problem).__name__}." \
+                      f"'problem' must be in ['RiskMinimization', 'SharpeRatioMaximization']."
+            raise ValueError(message)
+        problem_key = (type(problem), num_assets)
+        if self._problem_key != problem_key:
+            self._build(problem, num_assets)
+            self._problem_key = problem_key
+
+        start_time = time.perf_counter()
+        if isinstance(problem, SharpeRatioMaximization) and not asset_expctd_returns.max() > 0.0:
+            # The scaled problem is infeasible without any positive expected return.
+            asset_props = _select_max_sharpe_ratio_asset(asset_expctd_returns, asset_expctd_cov)
+        else:
+            asset_props = self._solve_cvx_problem(
+                problem, model, asset_expctd_returns, asset_expctd_cov, tee, max_time_limit
+            )
+            if asset_props is None:
+                return False
+        comp_time = time.perf_counter() - start_time
+
+        model.asset_props.set_values(dict(enumerate(asset_props.tolist())), skip_validation=True)
+        model.prtfl_expctd_return = asset_expctd_returns @ asset_props
+        model.prtfl_expctd_risk = np.sqrt(max(asset_props @ asset_expctd_cov @ asset_props, 0.0))
+
+        is_success = True
+
+        if is_print:
+            print(f'computation time = {comp_time}')
+            print(f'objective = {value(model.objctv)}')
+            print(f'portfolio risk = {value(model.prtfl_expctd_risk) * 100}[%]')
+            print(f'portfolio return = {value(model.prtfl_expctd_return) * 100}[%]')
+            print(f'sharpe ratio = {value(model.prtfl_expctd_return) / value(model.prtfl_expctd_risk)}')
+
+            for a, asset_name in enumerate(problem.asset_name_list_):
+                print(f'{asset_name}: {value(model.asset_props[a]) * 100}[%]')
+
+        return is_success
+
+    def _solve_cvx_problem(self, problem, model, asset_expctd_returns, asset_expctd_cov, tee, max_time_limit):
+        """Set the values of the parameters of the CVXPY problem and solve it.
+
+        Parameters
+        ----------
+        problem : RiskMinimization or SharpeRatioMaximization
+            The optimization problem to determine the asset proportions.
+
+        model : ConcreteModel
+            The concrete optimization model of the problem.
+
+        asset_expctd_returns : ndarray of shape (num_assets) and float
+            The expected returns of the assets.
+
+        asset_expctd_cov : ndarray of shape (num_assets, num_assets) and float
+            The expected covariances of the assets.
+
+        tee : bool
+            The option whether to output the progress of the optimization process.
+
+        max_time_limit : int
+            The time to abort the solution process. If not positive, the time is not limited.
+
+        Returns
+        -------
+        asset_props : ndarray of shape (num_assets) and float or None
+            The proportions of the assets, or None if the problem is not solved.
+        """
+        # Scale the expected return constraint to keep the problem well-conditioned for any magnitude of the returns.
+        # For the Sharpe ratio maximization, the highest expected return is scaled to 1 so that the scaled portfolio
+        # does not grow large even if the positive expected returns are much smaller than the negative ones.
+        if isinstance(problem, SharpeRatioMaximization):
+            return_scale = asset_expctd_returns.max()
+        else:
+            return_scale = np.abs(asset_expctd_returns).max()
+        if not return_scale > 0.0:
+            return_scale = 1.0
+        # Factorize the covariances as F F^T, which keeps the risk a sum of squares for any semidefinite covariances.
+        eigvals, eigvecs = np.linalg.eigh(asset_expctd_cov)
+        cov_factor = eigvecs * np.sqrt(np.clip(eigvals, 0.0, None))
+
+        self._asset_expctd_returns.value = asset_expctd_returns / return_scale
+        self._cov_factor.value = cov_factor.T
+        if isinstance(problem, RiskMinimization):
+            self._prtfl_expctd_return_lower.value = value(model.prtfl_expctd_return_lower) / return_scale
+
+        settings = {"eps_abs": 1e-9, "eps_rel": 1e-9, "max_iter": 100000}
+        if max_time_limit > 0:
+            settings["time_limit"] = max_time_limit
+        try:
+            self._cvx_problem.solve(solver=cp.OSQP, warm_start=True, verbose=tee, **settings)
+        except cp.error.SolverError as e:
+            print(f'The problem not solved: {e}.')
+            return None
+
+        if self._cvx_problem.status != cp.OPTIMAL:
+            print(f'The problem not solved: {self._cvx_problem.status}.')
+            return None
+
+        asset_props = np.clip(self._asset_props.value, 0.0, None)
+        if isinstance(problem, SharpeRatioMaximization):
+            asset_props /= asset_props.sum()
+        return asset_props
+
+    def _build(self, problem, num_assets):
+        """Build the CVXPY problem with the parameters for the type of the problem and the number of the assets.
+
+        Parameters
+        ----------
+        problem : RiskMinimization or SharpeRatioMaximization
+            The optimization problem to determine the asset proportions.
+
+        num_assets : int
+            The number of the assets.
+        """
+        self._asset_props = cp.Variable(num_assets, nonneg=True)
+        self._asset_expctd_returns = cp.Parameter(num_assets)
+        self._cov_factor = cp.Parameter((num_assets, num_assets))
+
+        objective = cp.Minimize(cp.sum_squares(self._cov_factor @ self._asset_props))
+        if isinstance(problem, RiskMinimization):
+            self._prtfl_expctd_return_lower = cp.Parameter()
+            constraints = [
+                self._asset_expctd_returns @ self._asset_props >= self._prtfl_expctd_return_lower,
+                cp.sum(self._asset_props) == 1.0,
+                self._asset_props <= 1.0,
+            ]
+        else:
+            self._prtfl_expctd_return_lower = None
+            constraints = [self._asset_expctd_returns @ self._asset_props == 1.0]
+        self._cvx_problem = cp.Problem(objective, constraints)
+
+
+def _import_cvxpy():
+    """Import CVXPY into the module unless it has already been imported."""
+    global cp
+    if cp is not None:
+        return
+    try:
+        import cvxpy
+    except ImportError:
+        message = "CVXPY is required to solve the problems by the parameterized programming of CVXPY."
+        raise ImportError(message)
+    cp = cvxpy
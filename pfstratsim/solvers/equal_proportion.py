@@ -45,21 +45,16 @@ class EqualProportion(SolverInterface):
         start_time = time.perf_counter()
 
         # Calculate the asset proportions.
-        for a in model.set_asset:
-            model.asset_props[a] = 1.0 / len(model.asset_props)
-
-        # Calculate the expected return of the portfolio
-        prtfl_expctd_return = 0.0
-        for a in model.set_asset:
-            prtfl_expctd_return += value(model.asset_expctd_returns[a] * model.asset_props[a])
-        model.prtfl_expctd_return = prtfl_expctd_return
-
-        # Calculate the expected risk of the portfolio
-        prtfl_expctd_var = 0.0
-        for a in model.set_asset:
-            for a1 in model.set_asset:
-                prtfl_expctd_var += value(model.asset_expctd_corr_cf[a, a1] * model.asset_expctd_risks[a] * model.asset_expctd_risks[a1] * model.asset_props[a] * model.asset_props[a1])
-        model.prtfl_expctd_risk = np.sqrt(prtfl_expctd_var)
+        num_assets = len(model.set_asset)
+        asset_props = np.full(num_assets, 1.0 / num_assets)
+        model.asset_props.set_values(dict(enumerate(asset_props.tolist())), skip_validation=True)
+
+        # Calculate the expected return and risk of the portfolio from the arrays kept by the problem, with the risk as
+        # the quadratic form over the covariances in a single matrix-vector product.
+        asset_expctd_returns = problem.asset_expctd_returns_.to_numpy(dtype=np.float64)
+        asset_expctd_cov = problem.asset_expctd_cov_
+        model.prtfl_expctd_return = asset_expctd_returns @ asset_props
+        model.prtfl_expctd_risk = np.sqrt(max(asset_props @ asset_expctd_cov @ asset_props, 0.0))
 
         comp_time = time.perf_counter() - start_time
 
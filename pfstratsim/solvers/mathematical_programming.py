@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import time
 from pyomo.environ import *
@@ -10,9 +11,15 @@ class MathematicalProgramming(SolverInterface):
 
     This is a concrete class on the strategy pattern for solver algorithms.
 
+    The solution of the previous problem is kept and given as the initial values of the next problem with the same
+    number of the assets, since the problems on the consecutive rebalancing dates tend to have similar solutions. The
+    optimization solver is created once and reused for all the problems. A persistent solver interface, e.g.
+    "gurobi_persistent", has the model set once while the model is the same, and only its objective and constraints,
+    in which the updated parameters are baked, are replaced for the next problems.
+
     Parameters
     ----------
-    solver_name : {"baron", "gurobi"}
+    solver_name : {"baron", "gurobi", "gurobi_persistent"}
         The name of the optimization solver to solve the problem formulated as mathematical programming problem.
 
     params : dict
@@ -21,6 +28,16 @@ class MathematicalProgramming(SolverInterface):
     """
     def __init__(self, solver_name=None, **params):
         self._solver_name = solver_name
+        self._opt = None
+        self._opt_model = None
+        self._prev_asset_props = None
+
+    def __getstate__(self):
+        # Drop the optimization solver, which may hold the native model of a persistent solver, to create it again.
+        state = self.__dict__.copy()
+        state["_opt"] = None
+        state["_opt_model"] = None
+        return state
 
     def solve(self, problem, is_print=False, tee=False, max_time_limit=-1, **params):
         """Solve the problem given.
@@ -49,10 +66,26 @@ class MathematicalProgramming(SolverInterface):
             True if the problem is solved properly.
         """
         model = problem.cncrt_model_
-        opt = SolverFactory(self._solver_name)
+        if self._opt is None:
+            self._opt = SolverFactory(self._solver_name)
+        opt = self._opt
+
+        # Set the previous solution as the initial values if it is available.
+        prev_asset_props = self._prev_asset_props
+        is_warm_start = prev_asset_props is not None and len(prev_asset_props) == len(model.set_asset)
+        if is_warm_start:
+            model.asset_props.set_values(dict(enumerate(prev_asset_props.tolist())), skip_validation=True)
+            prtfl_expctd_var = prev_asset_props @ problem.asset_expctd_cov_ @ prev_asset_props
+            model.prtfl_expctd_return.value = float(problem.asset_expctd_returns_.to_numpy() @ prev_asset_props)
+            model.prtfl_expctd_risk.value = float(np.sqrt(max(prtfl_expctd_var, 0.0)))
 
         start_time = time.perf_counter()
-        result = opt.solve(model, tee=tee, options={'Maxtime': max_time_limit})#, 'NumSol':100}, keepfiles=True)
+        if hasattr(opt, "set_instance"):
+            self._update_instance(opt, model)
+        if is_warm_start and opt.warm_start_capable():
+            result = opt.solve(model, tee=tee, warmstart=True, options={'Maxtime': max_time_limit})
+        else:
+            result = opt.solve(model, tee=tee, options={'Maxtime': max_time_limit})#, 'NumSol':100}, keepfiles=True)
         comp_time = time.perf_counter() - start_time
         if result.solver.termination_condition == TerminationCondition.infeasible:
             print('The problem infeasible.')
@@ -62,6 +95,7 @@ class MathematicalProgramming(SolverInterface):
             is_success = False
         else:
             is_success = True
+            self._prev_asset_props = np.array([value(model.asset_props[a]) for a in model.set_asset])
 
         if is_print:
             print(f'computation time = {comp_time}')
@@ -74,3 +108,26 @@ class MathematicalProgramming(SolverInterface):
                 print(f'{asset_name}: {value(model.asset_props[a]) * 100}[%]')
 
         return is_success
+
+    def _update_instance(self, opt, model):
+        """Set the model to the persistent solver, or update the model already set with the current parameters.
+
+        The persistent solver does not follow the updates of the mutable parameters, which are baked in the objective
+        and the constraints when they are added, so that only they are replaced while the variables are kept.
+
+        Parameters
+        ----------
+        opt : PersistentSolver
+            The persistent optimization solver.
+
+        model : ConcreteModel
+            The concrete optimization model for the problem.
+        """
+        if self._opt_model is not model:
+            opt.set_instance(model)
+            self._opt_model = model
+            return
+        for constr in model.component_data_objects(Constraint, active=True, descend_into=True):
+            opt.remove_constraint(constr)
+            opt.add_constraint(constr)
+        opt.set_objective(next(model.component_data_objects(Objective, active=True, descend_into=True)))
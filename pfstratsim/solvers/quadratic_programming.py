@@ -0,0 +1,255 @@
+import numpy as np
+import time
+from scipy import linalg, sparse
+from pyomo.environ import *
+try:
+    import osqp
+except ImportError:
+    osqp = None
+
+from .solver_interface import SolverInterface
+from ..problems import RiskMinimization, SharpeRatioMaximization
+
+
+class QuadraticProgramming(SolverInterface):
+    """The solver algorithm using quadratic programming.
+
+    This is a concrete class on the strategy pattern for solver algorithms.
+
+    The problem is solved by OSQP as a convex quadratic program without passing the Pyomo model to an external
+    optimization solver, and the solution is written back to the model. The risk minimization is solved as it is, and
+    the Sharpe ratio maximization is solved through the problem that minimizes the risk of the portfolio scaled to an
+    expected return of 1, which is equivalent only if any of the assets has a positive expected return. Otherwise, the
+    scaled problem is infeasible and the asset with the highest Sharpe ratio is selected, which maximizes the Sharpe
+    ratio of the portfolio then. The risk minimization is solved analytically without OSQP if the global minimum
+    variance portfolio satisfies all of its inequality constraints. The OSQP instance is set up once and only its data
+    are updated for the next problems with the same number of the assets, and the solution of the previous problem is
+    given as the initial iterate of the next one.
+
+    Parameters
+    ----------
+    params : dict
+        The parameters not to be used in this class but necessary just to realize the API that can call the constructor
+        of all the solver algorithm by one way.
+    """
+    def __init__(self, **params):
+        if osqp is None:
+            message = "OSQP is required to solve the problems by the quadratic programming."
+            raise ImportError(message)
+        self._osqp = None
+        self._num_assets = None
+        self._prev_primal = None
+        self._prev_dual = None
+
+    def solve(self, problem, is_print=False, tee=False, max_time_limit=-1, **params):
+        """Solve the problem given.
+
+        Parameters
+        ----------
+        problem : RiskMinimization or SharpeRatioMaximization
+            The optimization problem to determine the asset proportions.
+
+        is_print : bool, default False
+            The option whether to output the result summary.
+
+        tee : bool, default False
+            The option whether to output the progress of the optimization process.
+
+        max_time_limit : int, default=-1
+            The time to abort the solution process. If not positive, the time is not limited.
+
+        params : dict
+            The parameters not to be used in this class but necessary just to realize the API that can call this method
+            of all the solver algorithm by one way.
+
+        Returns
+        -------
+        is_success : bool
+            True if the problem is solved properly.
+        """
+        model = problem.cncrt_model_
+        asset_expctd_returns = problem.asset_expctd_returns_.to_numpy()
+        asset_expctd_cov = problem.asset_expctd_cov_
+        num_assets = len(asset_expctd_returns)
+
+        # Scale the expected return constraint to keep the problem well-conditioned for any magnitude of the returns.
+        # For the Sharpe ratio maximization, the highest expected return is scaled to 1 so that the scaled portfolio
+        # does not grow large even if the positive expected returns are much smaller than the negative ones.
+        if isinstance(problem, SharpeRatioMaximization):
+            return_scale = asset_expctd_returns.max()
+        else:
+            return_scale = np.abs(asset_expctd_returns).max()
+        if not return_scale > 0.0:
+            return_scale = 1.0
+
+        # Set the bounds of the constraints [expected return; sum of the proportions; proportions].
+        lower = np.zeros(num_assets + 2)
+        upper = np.full(num_assets + 2, np.inf)
+        if isinstance(problem, RiskMinimization):
+            lower[0] = value(model.prtfl_expctd_return_lower) / return_scale
+            lower[1] = upper[1] = 1.0
+            upper[2:] = 1.0
+        elif isinstance(problem, SharpeRatioMaximization):
+            lower[0] = upper[0] = 1.0
+        else:
+            message = f"Invalid type for 'problem': {type(problem).__name__}." \
+                      f"'problem' must be in ['RiskMinimization', 'SharpeRatioMaximization']."
+            raise ValueError(message)
+
+        start_time = time.perf_counter()
+        asset_props = None
+        if isinstance(problem, RiskMinimization):
+            asset_props = self._solve_min_variance(
+                asset_expctd_returns, asset_expctd_cov, value(model.prtfl_expctd_return_lower)
+            )
+        elif not asset_expctd_returns.max() > 0.0:
+            asset_props = _select_max_sharpe_ratio_asset(asset_expctd_returns, asset_expctd_cov)
+        if asset_props is None:
+            self._setup(asset_expctd_returns / return_scale, asset_expctd_cov, lower, upper, tee, max_time_limit)
+            if self._prev_primal is not None and len(self._prev_primal) == num_assets:
+                self._osqp.warm_start(x=self._prev_primal, y=self._prev_dual)
+            result = self._osqp.solve()
+
+            if result.info.status != "solved":
+                print(f'The problem not solved: {result.info.status}.')
+                return False
+            self._prev_primal = result.x.copy()
+            self._prev_dual = result.y.copy()
+
+            asset_props = np.clip(result.x, 0.0, None)
+            if isinstance(problem, SharpeRatioMaximization):
+                asset_props /= asset_props.sum()
+        comp_time = time.perf_counter() - start_time
+
+        model.asset_props.set_values(dict(enumerate(asset_props.tolist())), skip_validation=True)
+        model.prtfl_expctd_return = asset_expctd_returns @ asset_props
+        model.prtfl_expctd_risk = np.sqrt(max(asset_props @ asset_expctd_cov @ asset_props, 0.0))
+
+        is_success = True
+
+        if is_print:
+            print(f'computation time = {comp_time}')
+            print(f'objective = {value(model.objctv)}')
+            print(f'portfolio risk = {value(model.prtfl_expctd_risk) * 100}[%]')
+            print(f'portfolio return = {value(model.prtfl_expctd_return) * 100}[%]')
+            print(f'sharpe ratio = {value(model.prtfl_expctd_return) / value(model.prtfl_expctd_risk)}')
+
+            for a, asset_name in enumerate(problem.asset_name_list_):
+                print(f'{asset_name}: {value(model.asset_props[a]) * 100}[%]')
+
+        return is_success
+
+    @staticmethod
+    def _solve_min_variance(asset_expctd_returns, asset_expctd_cov, prtfl_expctd_return_lower):
+        """Solve the risk minimization analytically if none of its inequality constraints is active.
+
+        The global minimum variance portfolio, which minimizes the risk only under the sum of the proportions of 1, is
+        the solution of the risk minimization as well if it satisfies the bounds of the proportions and the lower bound
+        of the expected return.
+
+        Parameters
+        ----------
+        asset_expctd_returns : ndarray of shape (num_assets) and float
+            The expected returns of the assets.
+
+        asset_expctd_cov : ndarray of shape (num_assets, num_assets) and float
+            The expected covariances of the assets.
+
+        prtfl_expctd_return_lower : float
+            The lower bound of the expected return of the portfolio.
+
+        Returns
+        -------
+        asset_props : ndarray of shape (num_assets) and float or None
+            The proportions of the assets, or None if the covariances are not positive definite or any of the
+            inequality constraints is active.
+        """
+        try:
+            cov_factor = linalg.cho_factor(asset_expctd_cov)
+        except linalg.LinAlgError:
+            return None
+        asset_props = linalg.cho_solve(cov_factor, np.ones(len(asset_expctd_returns)))
+        asset_props /= asset_props.sum()
+
+        if not (np.all(asset_props >= 0.0) and np.all(asset_props <= 1.0)):
+            return None
+        if not asset_expctd_returns @ asset_props >= prtfl_expctd_return_lower:
+            return None
+        return asset_props
+
+    def _setup(self, asset_expctd_returns, asset_expctd_cov, lower, upper, tee, max_time_limit):
+        """Set up the OSQP instance, or update its data if it has already been set up for the same number of assets.
+
+        Parameters
+        ----------
+        asset_expctd_returns : ndarray of shape (num_assets) and float
+            The expected returns of the assets.
+
+        asset_expctd_cov : ndarray of shape (num_assets, num_assets) and float
+            The expected covariances of the assets.
+
+        lower : ndarray of shape (num_assets + 2) and float
+            The lower bounds of the constraints.
+
+        upper : ndarray of shape (num_assets + 2) and float
+            The upper bounds of the constraints.
+
+        tee : bool
+            The option whether to output the progress of the optimization process.
+
+        max_time_limit : int
+            The time to abort the solution process. If not positive, the time is not limited.
+        """
+        num_assets = len(asset_expctd_returns)
+        # Keep the sparsity patterns fixed, with explicit zeros, so that only the data need updating afterwards.
+        cols, rows = np.tril_indices(num_assets)  # the upper triangle in the column-major order as CSC requires
+        quad_data = 2.0 * asset_expctd_cov[rows, cols]
+        cnstr_data = np.column_stack([asset_expctd_returns, np.ones(num_assets), np.ones(num_assets)]).ravel()
+
+        if self._osqp is None or self._num_assets != num_assets:
+            quad_indptr = np.concatenate([[0], np.cumsum(np.arange(1, num_assets + 1))])
+            quad = sparse.csc_matrix((quad_data, rows, quad_indptr), shape=(num_assets, num_assets))
+            cnstr_indices = np.column_stack([np.zeros(num_assets), np.ones(num_assets), np.arange(2, num_assets + 2)])
+            cnstr_indptr = np.arange(0, 3 * num_assets + 1, 3)
+            cnstr = sparse.csc_matrix(
+                (cnstr_data, cnstr_indices.ravel().astype(int), cnstr_indptr), shape=(num_assets + 2, num_assets)
+            )
+            settings = {
+                "verbose": tee, "warm_start": True, "polish": True,
+                "eps_abs": 1e-9, "eps_rel": 1e-9, "max_iter": 100000,
+            }
+            if max_time_limit > 0:
+                settings["time_limit"] = max_time_limit
+            self._osqp = osqp.OSQP()
+            self._osqp.setup(quad, np.zeros(num_assets), cnstr, lower, upper, **settings)
+            self._num_assets = num_assets
+        else:
+            self._osqp.update(Px=quad_data, Ax=cnstr_data, l=lower, u=upper)
+
+
+def _select_max_sharpe_ratio_asset(asset_expctd_returns, asset_expctd_cov):
+    """Select the asset with the highest Sharpe ratio when none of the assets has a positive expected return.
+
+    The Sharpe ratio of the portfolio is then the negative of the ratio of its risk, a convex function, to the negative
+    of its expected return, a nonnegative linear function. Such a ratio is quasiconvex on the proportions, so that its
+    maximum over the proportions summing up to 1 is taken by a single asset, of which the Sharpe ratio is the highest.
+
+    Parameters
+    ----------
+    asset_expctd_returns : ndarray of shape (num_assets) and float
+        The expected returns of the assets, none of which is positive.
+
+    asset_expctd_cov : ndarray of shape (num_assets, num_assets) and float
+        The expected covariances of the assets.
+
+    Returns
+    -------
+    asset_props : ndarray of shape (num_assets) and float
+        The proportions of the assets, 1 for the asset selected and 0 for the others.
+    """
+    asset_expctd_risks = np.sqrt(np.clip(np.diag(asset_expctd_cov), 0.0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe_ratios = np.where(asset_expctd_risks > 0.0, asset_expctd_returns / asset_expctd_risks, -np.inf)
+    asset_props = np.zeros(len(asset_expctd_returns))
+    asset_props[np.argmax(sharpe_ratios)] = 1.0
+    return asset_props
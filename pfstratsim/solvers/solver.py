@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from pyomo.environ import *
 
@@ -29,6 +30,21 @@ class Solver(object):
     prtfl_expctd_risk_ : DataFrame of shape (num_times=1, num_prtfls=1) and float
         The expected risk of the portfolio based on the asset proportions.
 
+    asset_props_arr_ : ndarray of shape (num_assets) and float
+        The asset proportions calculated by the solver algorithm, which is the view of `asset_props_`.
+
+    asset_expctd_returns_arr_ : ndarray of shape (num_assets) and float
+        The expected returns of the assets on the problem, which is the view of `asset_expctd_returns_`.
+
+    asset_expctd_risks_arr_ : ndarray of shape (num_assets) and float
+        The expected risks of the assets on the problem, which is the view of `asset_expctd_risks_`.
+
+    prtfl_expctd_return_arr_ : ndarray of shape (num_prtfls=1) and float
+        The expected return of the portfolio based on the asset proportions, which is the view of
+        `prtfl_expctd_return_`.
+
+    prtfl_expctd_risk_arr_ : ndarray of shape (num_prtfls=1) and float
+        The expected risk of the portfolio based on the asset proportions, which is the view of `prtfl_expctd_risk_`.
     """
     def __init__(self, cncrt_solver):
         self._cncrt_solver = cncrt_solver
@@ -52,42 +68,107 @@ class Solver(object):
         is_success = self._cncrt_solver.solve(problem, **params)
         if is_success:
             model = problem.cncrt_model_
-            self._asset_props_ = pd.DataFrame(
-                [value(model.asset_props[a]) for a in range(len(problem.asset_name_list_))],
-                index=problem.asset_name_list_, columns=[problem.crnt_time_]
-            ).T
-            self._asset_expctd_returns_ = pd.DataFrame(
-                [value(model.asset_expctd_returns[a]) for a in range(len(problem.asset_name_list_))],
-                index=problem.asset_name_list_, columns=[problem.crnt_time_]
-            ).T
-            self._asset_expctd_risks_ = pd.DataFrame(
-                [value(model.asset_expctd_risks[a]) for a in range(len(problem.asset_name_list_))],
-                index=problem.asset_name_list_, columns=[problem.crnt_time_]
-            ).T
-            self._prtfl_expctd_return_ = pd.DataFrame(
-                [value(model.prtfl_expctd_return)], index=[problem.crnt_time_], columns=['prtfl_expctd_return']
-            )
-            self._prtfl_expctd_risk_ = pd.DataFrame(
-                [value(model.prtfl_expctd_risk)], index=[problem.crnt_time_], columns=['prtfl_expctd_risk']
-            )
+            num_assets = len(problem.asset_name_list_)
+            # Keep the values as arrays for the numerical use and leave the data frames to be built when accessed.
+            self._asset_props_arr_ = _extract_values(model.asset_props, num_assets)
+            self._asset_expctd_returns_arr_ = _extract_values(model.asset_expctd_returns, num_assets)
+            self._asset_expctd_risks_arr_ = _extract_values(model.asset_expctd_risks, num_assets)
+            self._prtfl_expctd_return_arr_ = np.array([model.prtfl_expctd_return.value], dtype=np.float64)
+            self._prtfl_expctd_risk_arr_ = np.array([model.prtfl_expctd_risk.value], dtype=np.float64)
+            self._index = [problem.crnt_time_]
+            self._asset_name_list = problem.asset_name_list_
+            self._asset_props_ = None
+            self._asset_expctd_returns_ = None
+            self._asset_expctd_risks_ = None
+            self._prtfl_expctd_return_ = None
+            self._prtfl_expctd_risk_ = None
         return is_success
 
+    def _to_frame(self, values, columns):
+        """Wrap the values of the latest solution in a data frame without copying.
+
+        Parameters
+        ----------
+        values : ndarray of shape (num_columns) and float
+            The values of the latest solution.
+
+        columns : list of shape (num_columns) and str
+            The columns of the data frame.
+
+        Returns
+        -------
+        data : DataFrame of shape (num_times=1, num_columns) and float
+            The data frame of the values.
+        """
+        return pd.DataFrame(values[np.newaxis, :], index=self._index, columns=columns, copy=False)
+
     @property
     def asset_props_(self):
+        if self._asset_props_ is None:
+            self._asset_props_ = self._to_frame(self._asset_props_arr_, self._asset_name_list)
         return self._asset_props_
 
     @property
     def asset_expctd_returns_(self):
+        if self._asset_expctd_returns_ is None:
+            self._asset_expctd_returns_ = self._to_frame(self._asset_expctd_returns_arr_, self._asset_name_list)
         return self._asset_expctd_returns_
 
     @property
     def asset_expctd_risks_(self):
+        if self._asset_expctd_risks_ is None:
+            self._asset_expctd_risks_ = self._to_frame(self._asset_expctd_risks_arr_, self._asset_name_list)
         return self._asset_expctd_risks_
 
     @property
     def prtfl_expctd_return_(self):
+        if self._prtfl_expctd_return_ is None:
+            self._prtfl_expctd_return_ = self._to_frame(self._prtfl_expctd_return_arr_, ["prtfl_expctd_return"])
         return self._prtfl_expctd_return_
 
     @property
     def prtfl_expctd_risk_(self):
+        if self._prtfl_expctd_risk_ is None:
+            self._prtfl_expctd_risk_ = self._to_frame(self._prtfl_expctd_risk_arr_, ["prtfl_expctd_risk"])
         return self._prtfl_expctd_risk_
+
+    @property
+    def asset_props_arr_(self):
+        return self._asset_props_arr_
+
+    @property
+    def asset_expctd_returns_arr_(self):
+        return self._asset_expctd_returns_arr_
+
+    @property
+    def asset_expctd_risks_arr_(self):
+        return self._asset_expctd_risks_arr_
+
+    @property
+    def prtfl_expctd_return_arr_(self):
+        return self._prtfl_expctd_return_arr_
+
+    @property
+    def prtfl_expctd_risk_arr_(self):
+        return self._prtfl_expctd_risk_arr_
+
+
+def _extract_values(component, num_assets):
+    """Extract the values of the indexed variable or mutable parameter by the attribute of its data directly.
+
+    Reading the attribute avoids the dispatch of `value` by the type of the component for each asset.
+
+    Parameters
+    ----------
+    component : IndexedVar or IndexedParam
+        The component of the model indexed by the assets.
+
+    num_assets : int
+        The number of the assets.
+
+    Returns
+    -------
+    values : ndarray of shape (num_assets) and float
+        The values of the component.
+    """
+    return np.fromiter((component[a].value for a in range(num_assets)), dtype=np.float64, count=num_assets)
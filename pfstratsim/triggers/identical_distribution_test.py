@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from scipy import stats
+from joblib import Parallel, delayed
 
 from .trigger_interface import TriggerInterface
 from ..utils import calc_asset_returns
@@ -20,10 +22,21 @@ class IdenticalDistributionTest(TriggerInterface):
         The threshold of the probability of identical distribution for the two datasets of the returns calculated from
         the current and previous datasets of the prices. If the probability is less than or equal to this threshold, the
         datasets are not regarded to come from an identical distribution.
+
+    _test_n_jobs : int, default 1
+        The number of the jobs to test the assets in parallel where they cannot be tested at once by the vectorized
+        tests. Worth more than 1 only for many assets with long windows, since each test takes little time.
     """
-    def __init__(self, test_method="anderson_darling", prob_thrshld=0.05, **params):
+    def __init__(self, test_method="anderson_darling", prob_thrshld=0.05, test_n_jobs=1, **params):
         self._test_method = test_method
         self._prob_thrshld = prob_thrshld
+        self._test_n_jobs = test_n_jobs
+        # The columns of the returns last tested and the mask of the cash in them, kept while the columns are the same
+        self._cash_mask_cache = (None, None)
+        # The previous and the last current prices with their returns, by which the returns of the previous prices are
+        # reused until the next rebalancing, at which the last current prices become the previous ones
+        self._prev_returns_cache = (None, None)
+        self._crnt_returns_cache = (None, None)
 
     def assess(self, crnt_time, crnt_prices, prev_prices=None, **params):
         """Assess the necessity of rebalancing.
@@ -55,24 +68,183 @@ class IdenticalDistributionTest(TriggerInterface):
         """
         if prev_prices is not None:
             crnt_returns = calc_asset_returns(crnt_prices)
-            prev_returns = calc_asset_returns(prev_prices)
-            idntcl_dstrbtn_prob = pd.DataFrame()
-            for asset_name in crnt_returns:
-                # Anderson Darling Test for k-samples
-                if self._test_method == "anderson_darling":
-                    if asset_name == 'CASH':
-                        p_value = 0.25  # the maximum value of the stats.anderson_ksamp return is 0.25
+            prev_returns = self._calc_prev_returns(prev_prices)
+            self._crnt_returns_cache = (crnt_prices, crnt_returns)
+            # Anderson Darling Test for k-samples, for all the assets at once if possible
+            if self._test_method == "anderson_darling":
+                is_cash = self._mask_cash(crnt_returns.columns)
+                p_values = _anderson_ksamp(crnt_returns.to_numpy(), prev_returns.to_numpy(), is_cash)
+                if p_values is None:
+                    p_values = np.full(len(crnt_returns.columns), np.nan)
+                    asset_names = crnt_returns.columns[~is_cash]
+                    if self._test_n_jobs == 1:
+                        p_value_list = [
+                            _anderson_ksamp_asset(crnt_returns[asset_name], prev_returns[asset_name])
+                            for asset_name in asset_names
+                        ]
                     else:
-                        p_value = stats.anderson_ksamp([crnt_returns[asset_name], prev_returns[asset_name]])[2]
-                # Kolmogorov Smirnov Test
-                elif self._test_method == "kolmogorov_smirnov":
-                    p_value = stats.kstest(crnt_returns[asset_name], prev_returns[asset_name])[1]
-                else:
-                    p_value = None
-                idntcl_dstrbtn_prob.loc[crnt_time, asset_name] = p_value
-            is_reblncng = idntcl_dstrbtn_prob.min().min() <= self._prob_thrshld
+                        p_value_list = Parallel(n_jobs=self._test_n_jobs)(
+                            delayed(_anderson_ksamp_asset)(crnt_returns[asset_name], prev_returns[asset_name])
+                            for asset_name in asset_names
+                        )
+                    p_values[~is_cash] = p_value_list
+                p_values[is_cash] = 0.25  # the maximum value of the stats.anderson_ksamp return is 0.25
+            # Kolmogorov Smirnov Test for all the assets at once
+            elif self._test_method == "kolmogorov_smirnov":
+                p_values = stats.ks_2samp(crnt_returns.to_numpy(), prev_returns.to_numpy(), axis=0).pvalue
+            else:
+                p_values = np.full(len(crnt_returns.columns), np.nan)
+            idntcl_dstrbtn_prob = pd.DataFrame(p_values[np.newaxis, :], index=[crnt_time], columns=crnt_returns.columns)
+            is_reblncng = np.nanmin(p_values) <= self._prob_thrshld
         else:
             is_reblncng = True
             idntcl_dstrbtn_prob = None
 
-        return is_reblncng, idntcl_dstrbtn_prob
\ No newline at end of file
+        return is_reblncng, idntcl_dstrbtn_prob
+
+    def _calc_prev_returns(self, prev_prices):
+        """Calculate the returns of the previous prices, reusing them for the same prices as before.
+
+        The prices are compared by their identity, since the previous prices are kept as the same object between the
+        rebalancing times.
+
+        Parameters
+        ----------
+        prev_prices : DataFrame of shape (num_times, num_assets) and float
+            The previous dataset of the prices.
+
+        Returns
+        -------
+        prev_returns : DataFrame of shape (num_times - 1, num_assets) and float
+            The returns of the previous prices.
+        """
+        cached_prices, prev_returns = self._prev_returns_cache
+        if prev_prices is not cached_prices:
+            crnt_prices, crnt_returns = self._crnt_returns_cache
+            prev_returns = crnt_returns if prev_prices is crnt_prices else calc_asset_returns(prev_prices)
+            self._prev_returns_cache = (prev_prices, prev_returns)
+        return prev_returns
+
+    def _mask_cash(self, columns):
+        """Mask the cash in the assets, reusing the mask for the same columns as the last ones.
+
+        Parameters
+        ----------
+        columns : Index of shape (num_assets) and str
+            The names of the assets.
+
+        Returns
+        -------
+        is_cash : ndarray of shape (num_assets) and bool
+            True for the cash.
+        """
+        cached_columns, is_cash = self._cash_mask_cache
+        if columns is not cached_columns:
+            is_cash = np.asarray(columns == 'CASH')
+            is_cash.flags.writeable = False
+            self._cash_mask_cache = (columns, is_cash)
+        return is_cash
+
+
+def _anderson_ksamp_asset(crnt_returns, prev_returns):
+    """Calculate the p-value of the Anderson-Darling test for the two samples of an asset.
+
+    Parameters
+    ----------
+    crnt_returns : Series of shape (num_crnt_times) and float
+        The current returns of the asset.
+
+    prev_returns : Series of shape (num_prev_times) and float
+        The previous returns of the asset.
+
+    Returns
+    -------
+    p_value : float
+        The p-value of the asset.
+    """
+    return stats.anderson_ksamp([crnt_returns, prev_returns])[2]
+
+
+def _anderson_ksamp(crnt_returns, prev_returns, is_skipped):
+    """Calculate the p-values of the Anderson-Darling test for the two samples of all the assets at once.
+
+    This calculates the midrank statistic and the p-value interpolated from the critical values as
+    `stats.anderson_ksamp` does, along the date-times of all the assets with the ties in each asset.
+
+    Parameters
+    ----------
+    crnt_returns : ndarray of shape (num_crnt_times, num_assets) and float
+        The current returns of the assets.
+
+    prev_returns : ndarray of shape (num_prev_times, num_assets) and float
+        The previous returns of the assets.
+
+    is_skipped : ndarray of shape (num_assets) and bool
+        The assets not to be tested, whose p-values are undefined.
+
+    Returns
+    -------
+    p_values : ndarray of shape (num_assets) and float or None
+        The p-values of the assets, capped at 0.25 and floored at 0.001. None if the returns have missing values or
+        too few observations, or any of the assets tested has fewer than two distinct returns, in which cases the
+        assets are to be tested by `stats.anderson_ksamp` one by one.
+    """
+    n = np.array([len(crnt_returns), len(prev_returns)])
+    N = n.sum()
+    num_assets = crnt_returns.shape[1]
+    if N < 4 or n.min() == 0 or np.isnan(crnt_returns).any() or np.isnan(prev_returns).any():
+        return None
+
+    # Sort all the observations of each asset with the labels of the samples.
+    returns = np.vstack([crnt_returns, prev_returns])
+    order = np.argsort(returns, axis=0, kind="mergesort")
+    sorted_returns = np.take_along_axis(returns, order, axis=0)
+    # Locate the distinct observations, of which the positions of the first and following the last in the sorted
+    # observations give the left and right insertion points.
+    pos = np.arange(N)[:, np.newaxis]
+    is_distinct = np.ones((N, num_assets), dtype=bool)
+    is_distinct[1:] = sorted_returns[1:] != sorted_returns[:-1]
+    if (is_distinct[:, ~is_skipped].sum(axis=0) < 2).any():
+        return None
+    next_pos = np.minimum.accumulate(np.where(is_distinct, pos, N)[::-1], axis=0)[::-1]
+    right_pos = np.vstack([next_pos[1:], np.full((1, num_assets), N)])
+    lj = right_pos - pos
+    Bj = pos + lj / 2.0
+    # Count the observations of the first sample up to each position, from which those of the second one follow.
+    crnt_counts = np.vstack([np.zeros((1, num_assets)), np.cumsum(order < n[0], axis=0)])
+    left_counts = crnt_counts[:-1]
+    right_counts = np.take_along_axis(crnt_counts, right_pos, axis=0)
+
+    A2kN = np.zeros(num_assets)
+    for left_count, right_count, n_i in [
+        (left_counts, right_counts, n[0]), (pos - left_counts, right_pos - right_counts, n[1])
+    ]:
+        Mij = (left_count + right_count) / 2.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inner = lj / N * (N * Mij - Bj * n_i) ** 2 / (Bj * (N - Bj) - N * lj / 4.0)
+        A2kN += np.where(is_distinct, inner, 0.0).sum(axis=0) / n_i
+    A2kN *= (N - 1.0) / N
+
+    # Standardize the statistics and interpolate the p-values from the critical values for the two samples.
+    k = 2
+    H = (1.0 / n).sum()
+    hs_cs = (1.0 / np.arange(N - 1, 1, -1)).cumsum()
+    h = hs_cs[-1] + 1
+    g = (hs_cs / np.arange(2, N)).sum()
+    a = (4 * g - 6) * (k - 1) + (10 - 6 * g) * H
+    b = (2 * g - 4) * k ** 2 + 8 * h * k + (2 * g - 14 * h - 4) * H - 8 * h + 4 * g - 6
+    c = (6 * h + 2 * g - 2) * k ** 2 + (4 * h - 4 * g + 6) * k + (2 * h - 6) * H + 4 * h
+    d = (2 * h + 6) * k ** 2 - 4 * h * k
+    sigmasq = (a * N ** 3 + b * N ** 2 + c * N + d) / ((N - 1.0) * (N - 2.0) * (N - 3.0))
+    A2 = (A2kN - (k - 1)) / np.sqrt(sigmasq)
+
+    # The interpolation coefficients from Table 2 of Scholz and Stephens 1987
+    b0 = np.array([0.675, 1.281, 1.645, 1.96, 2.326, 2.573, 3.085])
+    b1 = np.array([-0.245, 0.25, 0.678, 1.149, 1.822, 2.364, 3.615])
+    b2 = np.array([-0.105, -0.305, -0.362, -0.391, -0.396, -0.345, -0.154])
+    critical = b0 + b1 / np.sqrt(k - 1) + b2 / (k - 1)
+    sig = np.array([0.25, 0.1, 0.05, 0.025, 0.01, 0.005, 0.001])
+    p_values = np.exp(np.polyval(np.polyfit(critical, np.log(sig), 2), A2))
+    p_values[A2 < critical.min()] = sig.max()
+    p_values[A2 > critical.max()] = sig.min()
+    return p_values
@@ -1,4 +1,4 @@
-from datetime import timedelta
+import pandas as pd
 
 from .trigger_interface import TriggerInterface
 
@@ -19,6 +19,8 @@ class RegularBasis(TriggerInterface):
     """
     def __init__(self, reblncng_intrvl_day, **params):
         self._reblncng_intrvl_day = reblncng_intrvl_day
+        # Keep the interval in nanoseconds to compare the date-times as integers.
+        self._reblncng_intrvl_ns = pd.Timedelta(days=reblncng_intrvl_day).value
 
     def assess(self, crnt_time, reblncng_time_list, **params):
         """Assess the necessity of rebalancing.
@@ -44,7 +46,7 @@ class RegularBasis(TriggerInterface):
             The object not to be used but necessary just for API consistency of the trigger algorithm classes.
         """
         if len(reblncng_time_list) > 0:
-            is_reblncng = reblncng_time_list[-1] + timedelta(days=self._reblncng_intrvl_day) <= crnt_time
+            is_reblncng = reblncng_time_list[-1].value + self._reblncng_intrvl_ns <= crnt_time.value
         else:
             is_reblncng = True
         return is_reblncng, None
@@ -1,9 +1,13 @@
 from .parameter_calculation import (
-    calc_asset_returns, calc_asset_obsrvd_returns, calc_asset_obsrvd_risks, calc_corr_cf,
-    calc_asset_expctd_returns, calc_asset_expctd_risks,
+    calc_asset_returns, calc_asset_obsrvd_returns, calc_asset_obsrvd_risks, calc_corr_cf, calc_corr_cf_from_moments,
+    shrink_corr_cf, calc_asset_expctd_returns, calc_asset_expctd_risks,
+    calc_asset_obsrvd_returns_from_moments, calc_asset_obsrvd_risks_from_moments,
     calc_prtfl_obsrvd_return, calc_prtfl_obsrvd_risk,
 )
+from .rolling_moments import RollingMoments
 from .parameter_setting import read_params
+from .object_dumping import dump_object
+from .csv_writing import write_csv
 from .plotting import plot
 
 __all__ = [
@@ -11,10 +15,17 @@ __all__ = [
     "calc_asset_obsrvd_returns",
     "calc_asset_obsrvd_risks",
     "calc_corr_cf",
+    "calc_corr_cf_from_moments",
+    "shrink_corr_cf",
     "calc_asset_expctd_returns",
     "calc_asset_expctd_risks",
+    "calc_asset_obsrvd_returns_from_moments",
+    "calc_asset_obsrvd_risks_from_moments",
     "calc_prtfl_obsrvd_return",
     "calc_prtfl_obsrvd_risk",
+    "RollingMoments",
     "read_params",
+    "dump_object",
+    "write_csv",
     "plot",
 ]
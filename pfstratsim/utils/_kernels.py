@@ -0,0 +1,157 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Return the function as it is in place of the JIT compilation if numba is not installed."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def calc_returns(prices):
+    """Calculate the simple returns from the prices without missing values.
+
+    Parameters
+    ----------
+    prices : ndarray of shape (num_times, num_assets) and float
+        The historical prices of the assets.
+
+    Returns
+    -------
+    returns : ndarray of shape (num_times - 1, num_assets) and float
+        The historical returns of the assets.
+    """
+    return prices[1:] / prices[:-1] - 1.0
+
+
+@njit(cache=True)
+def calc_exp_weights(num_times, span):
+    """Calculate the normalized weights of the exponentially weighted mean with the adjustment, as pandas does.
+
+    Parameters
+    ----------
+    num_times : int
+        The number of the date-times to weight.
+
+    span : int
+        The span of the exponential weighting.
+
+    Returns
+    -------
+    weights : ndarray of shape (num_times) and float
+        The weights summing up to 1, the heaviest on the latest date-time.
+    """
+    decay = 1.0 - 2.0 / (span + 1.0)
+    weights = decay ** np.arange(num_times - 1, -1, -1).astype(np.float64)
+    return weights / weights.sum()
+
+
+@njit(cache=True)
+def calc_mean(returns):
+    """Calculate the means of the returns.
+
+    Parameters
+    ----------
+    returns : ndarray of shape (num_times, num_assets) and float
+        The historical returns of the assets.
+
+    Returns
+    -------
+    means : ndarray of shape (num_assets) and float
+        The means of the returns of the assets.
+    """
+    num_times, num_assets = returns.shape
+    means = np.zeros(num_assets)
+    for t in range(num_times):
+        for a in range(num_assets):
+            means[a] += returns[t, a]
+    return means / num_times
+
+
+@njit(cache=True)
+def calc_exp_mean(returns, span):
+    """Calculate the exponentially weighted means of the returns at the latest date-time.
+
+    Parameters
+    ----------
+    returns : ndarray of shape (num_times, num_assets) and float
+        The historical returns of the assets.
+
+    span : int
+        The span of the exponential weighting.
+
+    Returns
+    -------
+    means : ndarray of shape (num_assets) and float
+        The exponentially weighted means of the returns of the assets.
+    """
+    return calc_exp_weights(returns.shape[0], span).astype(returns.dtype) @ returns
+
+
+@njit(cache=True)
+def calc_sample_cov(returns):
+    """Calculate the unbiased sample covariances of the returns.
+
+    Parameters
+    ----------
+    returns : ndarray of shape (num_times, num_assets) and float
+        The historical returns of the assets.
+
+    Returns
+    -------
+    covs : ndarray of shape (num_assets, num_assets) and float
+        The covariances of the returns of the assets.
+    """
+    centered = returns - calc_mean(returns)
+    return centered.T @ centered / (returns.shape[0] - 1)
+
+
+@njit(cache=True)
+def calc_exp_var(returns, span):
+    """Calculate the exponentially weighted variances of the returns at the latest date-time, as pypfopt does.
+
+    Parameters
+    ----------
+    returns : ndarray of shape (num_times, num_assets) and float
+        The historical returns of the assets.
+
+    span : int
+        The span of the exponential weighting.
+
+    Returns
+    -------
+    variances : ndarray of shape (num_assets) and float
+        The exponentially weighted variances of the returns of the assets.
+    """
+    num_times, num_assets = returns.shape
+    means = calc_mean(returns)
+    weights = calc_exp_weights(num_times, span)
+    variances = np.zeros(num_assets)
+    for t in range(num_times):
+        for a in range(num_assets):
+            deviation = returns[t, a] - means[a]
+            variances[a] += weights[t] * deviation * deviation
+    return variances
+
+
+@njit(cache=True)
+def calc_corr(data):
+    """Calculate the Pearson correlation coefficients of the columns.
+
+    Parameters
+    ----------
+    data : ndarray of shape (num_times, num_assets) and float
+        The historical data of the assets.
+
+    Returns
+    -------
+    corr : ndarray of shape (num_assets, num_assets) and float
+        The correlation coefficients of the data of the assets.
+    """
+    centered = data - calc_mean(data)
+    covs = centered.T @ centered
+    stds = np.sqrt(np.diag(covs))
+    return covs / np.outer(stds, stds)
@@ -0,0 +1,33 @@
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+
+def write_csv(data, file_path):
+    """Write the data frame into the CSV file with the pyarrow writer if available, or with pandas otherwise.
+
+    The pyarrow writer formats the values in C at once, which is much faster than pandas for the long histories. The
+    index is written as the first column either way, with an empty name if it has no name, and the date-times
+    without the time are written as the dates.
+
+    Parameters
+    ----------
+    data : DataFrame
+        The data frame to be written.
+
+    file_path : str
+        The path of the CSV file.
+    """
+    if pacsv is None:
+        data.to_csv(file_path)
+    else:
+        index_name = "" if data.index.name is None else data.index.name
+        data = data.rename_axis(index_name).reset_index()
+        # Write the date-times without the time as the dates, as pandas does.
+        index_values = data[index_name]
+        if pd.api.types.is_datetime64_any_dtype(index_values) and (index_values == index_values.dt.normalize()).all():
+            data[index_name] = index_values.dt.date
+        pacsv.write_csv(pa.Table.from_pandas(data, preserve_index=False), file_path)
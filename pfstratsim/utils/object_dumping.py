@@ -0,0 +1,21 @@
+import pickle
+import joblib
+try:
+    import lz4  # enables the lz4 compressor of joblib
+    COMPRESS = ("lz4", 3)
+except ImportError:
+    COMPRESS = ("zlib", 3)
+
+
+def dump_object(value, file_path):
+    """Dump the object into the file with compression and the highest pickle protocol.
+
+    Parameters
+    ----------
+    value : object
+        The object to be dumped.
+
+    file_path : str
+        The path of the dump file.
+    """
+    joblib.dump(value, file_path, compress=COMPRESS, protocol=pickle.HIGHEST_PROTOCOL)
@@ -1,10 +1,21 @@
+import os
 import numpy as np
 import pandas as pd
 
 from pypfopt import expected_returns as er
 from pypfopt import risk_models as rm
 
+from . import _kernels
+
+try:
+    from sklearn.covariance import ledoit_wolf_shrinkage
+except ImportError:
+    ledoit_wolf_shrinkage = None
+
 DAY_TO_YEAR = 252
+# The floating point type of the prices and the returns in the calculations, which is float32 to halve the memory
+# traffic on long histories if the environment variable PFSTRATSIM_FP32 is "1", and float64 otherwise.
+FLOAT_DTYPE = np.float32 if os.environ.get("PFSTRATSIM_FP32", "0") == "1" else np.float64
 
 
 def calc_asset_returns(prices):
@@ -20,7 +31,18 @@ def calc_asset_returns(prices):
     returns : DataFrame of shape (num_times, num_assets) and float
         The historical returns of the assets.
     """
-    return er.returns_from_prices(prices)
+    prices_arr = _to_complete_array(prices)
+    if prices_arr is None:
+        # Leave the prices with missing values to pandas, which fills them forward before the division.
+        return er.returns_from_prices(prices.astype(FLOAT_DTYPE, copy=False))
+    # Divide the prices in one pass without the intermediate data frames, and drop the returns missing for all the
+    # assets as pandas does, which can only be those of the prices of 0.
+    returns_arr = _kernels.calc_returns(prices_arr)
+    index = prices.index[1:]
+    is_all_nan = np.isnan(returns_arr).all(axis=1)
+    if is_all_nan.any():
+        returns_arr, index = returns_arr[~is_all_nan], index[~is_all_nan]
+    return pd.DataFrame(returns_arr, index=index, columns=prices.columns, copy=False)
 
 
 def calc_corr_cf(prices):
@@ -36,10 +58,88 @@ def calc_corr_cf(prices):
     corr_cf : DataFrame of shape (num_assets, num_assets) and float
         The correlation coefficients of the assets.
     """
-    return prices.corr()
+    prices_arr = _to_complete_array(prices)
+    if prices_arr is None:
+        # Drop the date-times missing all the prices, which the pairwise deletion of pandas drops for every pair of the
+        # assets anyway, and leave only the prices with the other missing patterns to pandas.
+        prices_arr = np.asarray(prices, dtype=FLOAT_DTYPE)
+        prices_arr = _to_complete_array(prices_arr[~np.isnan(prices_arr).all(axis=1)])
+        if prices_arr is None or len(prices_arr) < 2:
+            return prices.corr()
+    corr_cf_arr = _kernels.calc_corr(prices_arr).astype(np.float64)
+    return pd.DataFrame(corr_cf_arr, index=prices.columns, columns=prices.columns)
+
+
+def calc_corr_cf_from_moments(num_times, sums, product_sums, columns=None):
+    """Calculate the correlation coefficients of the assets from the moments of the prices.
+
+    Parameters
+    ----------
+    num_times : int
+        The number of the date-times of the prices summed up.
+
+    sums : ndarray of shape (num_assets) and float
+        The sums of the prices of the assets over the date-times.
+
+    product_sums : ndarray of shape (num_assets, num_assets) and float
+        The sums of the products of the prices of each pair of the assets over the date-times.
+
+    columns : list of shape (num_assets) and str, default None
+        The index and the columns of the correlation coefficients.
+
+    Returns
+    -------
+    corr_cf : DataFrame of shape (num_assets, num_assets) and float
+        The correlation coefficients of the assets.
+    """
+    covs = (product_sums - np.outer(sums, sums) / num_times) / (num_times - 1)
+    risks = np.sqrt(np.diag(covs))
+    corr_cf = covs / np.outer(risks, risks)
+    return pd.DataFrame(corr_cf, index=columns, columns=columns)
+
+
+def shrink_corr_cf(corr_cf, prices, returns=None):
+    """Shrink the correlation coefficients of the assets toward the identity matrix by the Ledoit-Wolf method.
+
+    The shrinkage intensity is estimated from the standardized returns of the assets, so that the risks of the assets
+    are kept and only the correlations between them are shrunk.
+
+    Parameters
+    ----------
+    corr_cf : DataFrame of shape (num_assets, num_assets) and float
+        The correlation coefficients of the assets.
+
+    prices : DataFrame of shape (num_times, num_assets) and float
+        The historical prices of the assets.
+
+    returns : DataFrame or ndarray of shape (num_times - 1, num_assets) and float, default None
+        The historical returns of the assets calculated from the prices by `calc_asset_returns`. If given, they are used
+        instead of being calculated from the prices again.
+
+    Returns
+    -------
+    corr_cf : DataFrame of shape (num_assets, num_assets) and float
+        The shrunk correlation coefficients of the assets.
+    """
+    if ledoit_wolf_shrinkage is None:
+        message = "scikit-learn is required to shrink the correlation coefficients by the Ledoit-Wolf method."
+        raise ImportError(message)
+
+    if returns is None:
+        returns = calc_asset_returns(prices)
+    returns = np.asarray(returns, dtype=float)
+    returns = returns[~np.isnan(returns).any(axis=1)]
+    returns_stds = returns.std(axis=0)
+    returns_stds[returns_stds == 0.0] = 1.0
+    shrinkage = ledoit_wolf_shrinkage((returns - returns.mean(axis=0)) / returns_stds)
 
+    num_assets = len(corr_cf)
+    corr_cf_arr = (1.0 - shrinkage) * corr_cf.to_numpy() + shrinkage * np.eye(num_assets)
+    return pd.DataFrame(corr_cf_arr, index=corr_cf.index, columns=corr_cf.columns)
 
-def calc_asset_expctd_returns(prices, method="exp", compounding=True, frequency=DAY_TO_YEAR, span=2*DAY_TO_YEAR, dtype="DataFrame", index=None):
+
+def calc_asset_expctd_returns(prices, method="exp", compounding=True, frequency=DAY_TO_YEAR, span=2*DAY_TO_YEAR, dtype="DataFrame", index=None,
+                              returns=None):
     """Calculate the expected returns of the assets.
 
     Parameters
@@ -66,15 +166,30 @@ def calc_asset_expctd_returns(prices, method="exp", compounding=True, frequency=
     index : list of shape (num_times) and Timestamp, default None
         The index of the expected returns of the assets.
 
+    returns : DataFrame or ndarray of shape (num_times - 1, num_assets) and float, default None
+        The historical returns of the assets calculated from the prices by `calc_asset_returns`. If given, they are used
+        instead of being calculated from the prices again. The array must have no missing values.
+
     Returns
     -------
     returns : DataFrame of shape (num_times=1, num_assets) and float
         The expected returns of the assets.
     """
-    if method == "exp":
-        returns = er.ema_historical_return(prices, compounding=compounding, frequency=frequency, span=span)
+    returns_arr = _to_complete_returns_array(prices, returns)
+    if returns is None:
+        data, returns_data = prices, False
+    else:
+        data, returns_data = returns, True
+    if method == "exp" and returns_arr is not None:
+        # Annualize in float64 since the compounding over the frequency amplifies the rounding errors of float32.
+        returns = _kernels.calc_exp_mean(returns_arr, span).astype(np.float64)
+        returns = (1.0 + returns) ** frequency - 1.0 if compounding else returns * frequency
+    elif method == "exp":
+        returns = er.ema_historical_return(
+            data, returns_data=returns_data, compounding=compounding, frequency=frequency, span=span
+        )
     elif method == "mean":
-        returns = er.mean_historical_return(prices, compounding=compounding, frequency=frequency)
+        returns = er.mean_historical_return(data, returns_data=returns_data, compounding=compounding, frequency=frequency)
     else:
         message = f"Invalid value for 'method': {method}." \
                   f"'method' must be in ['exp', 'mean']."
@@ -83,7 +198,8 @@ def calc_asset_expctd_returns(prices, method="exp", compounding=True, frequency=
     return returns
 
 
-def calc_asset_expctd_risks(prices, method="exp", frequency=DAY_TO_YEAR, span=2*DAY_TO_YEAR, dtype="DataFrame", index=None):
+def calc_asset_expctd_risks(prices, method="exp", frequency=DAY_TO_YEAR, span=2*DAY_TO_YEAR, dtype="DataFrame", index=None,
+                            returns=None):
     """Calculate the expected risks of the assets.
 
     Parameters
@@ -107,26 +223,38 @@ def calc_asset_expctd_risks(prices, method="exp", frequency=DAY_TO_YEAR, span=2*
     index : list of shape (num_times) and Timestamp, default None
         The index of the expected risks of the assets.
 
+    returns : DataFrame or ndarray of shape (num_times - 1, num_assets) and float, default None
+        The historical returns of the assets calculated from the prices by `calc_asset_returns`. If given, they are used
+        instead of being calculated from the prices again. The array must have no missing values.
+
     Returns
     -------
     risks : DataFrame of shape (num_times=1, num_assets) and float
         The expected risks of the assets.
     """
-    if method == "exp":
-        covs = rm.exp_cov(prices, frequency=frequency, span=span)
+    returns_arr = _to_complete_returns_array(prices, returns)
+    if returns is None:
+        data, returns_data = prices, False
+    else:
+        data, returns_data = returns, True
+    if method == "exp" and returns_arr is not None:
+        # Calculate only the variances, without the covariances that the risks of the assets do not need.
+        variances = _kernels.calc_exp_var(returns_arr, span).astype(np.float64) * frequency
+    elif method == "exp":
+        variances = np.diag(rm.exp_cov(data, returns_data=returns_data, frequency=frequency, span=span))
     elif method == "mean":
-        covs = rm.sample_cov(prices, frequency=frequency)
+        variances = np.diag(rm.sample_cov(data, returns_data=returns_data, frequency=frequency))
         # covs = prices.pct_change().cov() * frequency
     else:
         message = f"Invalid value for 'method': {method}." \
                   f"'method' must be in ['exp', 'mean']."
         raise ValueError(message)
-    risks = np.sqrt(np.diag(covs))
+    risks = np.sqrt(variances)
     risks = _convert_dtype(risks, dtype, index, prices.columns)
     return risks
 
 
-def calc_asset_obsrvd_returns(prices, frequency=DAY_TO_YEAR, dtype="DataFrame", index=None):
+def calc_asset_obsrvd_returns(prices, frequency=DAY_TO_YEAR, dtype="DataFrame", index=None, returns=None):
     """Calculate the observed returns of the assets.
 
     Parameters
@@ -143,17 +271,28 @@ def calc_asset_obsrvd_returns(prices, frequency=DAY_TO_YEAR, dtype="DataFrame",
     index : list of shape (num_times) and Timestamp, default None
         The index of the observed returns of the assets.
 
+    returns : DataFrame or ndarray of shape (num_times - 1, num_assets) and float, default None
+        The historical returns of the assets calculated from the prices by `calc_asset_returns`. If given, they are used
+        instead of being calculated from the prices again. The array must have no missing values.
+
     Returns
     -------
     returns : DataFrame of shape (num_times=1, num_assets) and float
         The observed returns of the assets.
     """
-    returns = er.mean_historical_return(prices, compounding=False, frequency=frequency)
+    returns_arr = _to_complete_returns_array(prices, returns)
+    if returns_arr is None:
+        if returns is None:
+            returns = er.mean_historical_return(prices, compounding=False, frequency=frequency)
+        else:
+            returns = er.mean_historical_return(returns, returns_data=True, compounding=False, frequency=frequency)
+    else:
+        returns = _kernels.calc_mean(returns_arr) * frequency
     returns = _convert_dtype(returns, dtype, index, prices.columns)
     return returns
 
 
-def calc_asset_obsrvd_risks(prices, frequency=DAY_TO_YEAR, dtype="DataFrame", index=None):
+def calc_asset_obsrvd_risks(prices, frequency=DAY_TO_YEAR, dtype="DataFrame", index=None, returns=None):
     """Calculate the observed risks of the assets.
 
     Parameters
@@ -170,18 +309,104 @@ def calc_asset_obsrvd_risks(prices, frequency=DAY_TO_YEAR, dtype="DataFrame", in
     index : list of shape (num_times) and Timestamp, default None
         The index of the observed risks of the assets.
 
+    returns : DataFrame or ndarray of shape (num_times - 1, num_assets) and float, default None
+        The historical returns of the assets calculated from the prices by `calc_asset_returns`. If given, they are used
+        instead of being calculated from the prices again. The array must have no missing values.
+
     Returns
     -------
     risks : DataFrame of shape (num_times=1, num_assets) and float
         The observed risks of the assets.
     """
-    covs = rm.sample_cov(prices, frequency=frequency)
+    returns_arr = _to_complete_returns_array(prices, returns)
+    if returns_arr is None:
+        if returns is None:
+            covs = rm.sample_cov(prices, frequency=frequency)
+        else:
+            covs = rm.sample_cov(returns, returns_data=True, frequency=frequency)
+    else:
+        covs = rm.fix_nonpositive_semidefinite(_kernels.calc_sample_cov(returns_arr) * frequency)
     risks = np.sqrt(np.diag(covs))
     risks = _convert_dtype(risks, dtype, index, prices.columns)
     return risks
 
 
-def calc_prtfl_obsrvd_return(asset_props, index=None, columns=None, **kwargs):
+def calc_asset_obsrvd_returns_from_moments(num_times, sums, frequency=DAY_TO_YEAR, dtype="DataFrame", index=None,
+                                           columns=None):
+    """Calculate the observed returns of the assets from the sums of the returns.
+
+    Parameters
+    ----------
+    num_times : int
+        The number of the date-times of the returns summed up.
+
+    sums : ndarray of shape (num_assets) and float
+        The sums of the returns of the assets over the date-times.
+
+    frequency : int, default DAY_TO_YEAR=252
+        The number of days to convert daily rate to an arbitrary rate.
+
+    dtype : {"Series", "DataFrame"}, default "DataFrame"
+        The data type of the observed returns of the assets.
+
+    index : list of shape (num_times) and Timestamp, default None
+        The index of the observed returns of the assets.
+
+    columns : list of shape (num_assets) and str, default None
+        The columns of the observed returns of the assets.
+
+    Returns
+    -------
+    returns : DataFrame of shape (num_times=1, num_assets) and float
+        The observed returns of the assets.
+    """
+    returns = sums / num_times * frequency
+    returns = _convert_dtype(returns, dtype, index, columns)
+    return returns
+
+
+def calc_asset_obsrvd_risks_from_moments(num_times, sums, square_sums, frequency=DAY_TO_YEAR, dtype="DataFrame",
+                                         index=None, columns=None):
+    """Calculate the observed risks of the assets from the sums and the sums of the squares of the returns.
+
+    The returns may be shifted by any constants of the assets, which don't change the risks. Shifting them close to
+    their means avoids the cancellation of the large sums.
+
+    Parameters
+    ----------
+    num_times : int
+        The number of the date-times of the returns summed up.
+
+    sums : ndarray of shape (num_assets) and float
+        The sums of the returns of the assets over the date-times.
+
+    square_sums : ndarray of shape (num_assets) and float
+        The sums of the squares of the returns of the assets over the date-times.
+
+    frequency : int, default DAY_TO_YEAR=252
+        The number of days to convert daily rate to an arbitrary rate.
+
+    dtype : {"Series", "DataFrame"}, default "DataFrame"
+        The data type of the observed risks of the assets.
+
+    index : list of shape (num_times) and Timestamp, default None
+        The index of the observed risks of the assets.
+
+    columns : list of shape (num_assets) and str, default None
+        The columns of the observed risks of the assets.
+
+    Returns
+    -------
+    risks : DataFrame of shape (num_times=1, num_assets) and float
+        The observed risks of the assets.
+    """
+    variances = (square_sums - sums ** 2 / num_times) / (num_times - 1)
+    risks = np.sqrt(np.clip(variances, 0.0, None) * frequency)
+    risks = _convert_dtype(risks, dtype, index, columns)
+    return risks
+
+
+def calc_prtfl_obsrvd_return(asset_props, index=None, columns=None, asset_obsrvd_returns=None, **kwargs):
     """Calculate the observed return of the portfolio.
 
     Parameters
@@ -195,6 +420,9 @@ def calc_prtfl_obsrvd_return(asset_props, index=None, columns=None, **kwargs):
     columns : list of shape (num_prtfls=1) and str, default None
         The column of the observed return of the portfolio.
 
+    asset_obsrvd_returns : Series of shape (num_assets) and float, default None
+        The observed returns of the assets. If given, they are used instead of being calculated from `kwargs`.
+
     kwargs : dict
         The parameters to calculate the observed returns of the assets.
 
@@ -203,16 +431,13 @@ def calc_prtfl_obsrvd_return(asset_props, index=None, columns=None, **kwargs):
     return : DataFrame of shape (num_times=1, num_prtfls=1) and float
         The observed return of the portfolio
     """
-    asset_returns = calc_asset_obsrvd_returns(dtype="Series", **kwargs)
-    asset_props = asset_props.iloc[0,:]
-    num_assets = len(asset_props)
-    prtfl_return = 0.0
-    for a in range(num_assets):
-        prtfl_return += asset_returns[a] * asset_props[a]
+    if asset_obsrvd_returns is None:
+        asset_obsrvd_returns = calc_asset_obsrvd_returns(dtype="Series", **kwargs)
+    prtfl_return = asset_props.to_numpy(dtype=np.float64)[0] @ np.asarray(asset_obsrvd_returns, dtype=np.float64)
     return pd.DataFrame([prtfl_return], index=index, columns=columns)
 
 
-def calc_prtfl_obsrvd_risk(asset_props, index=None, columns=None, **kwargs):
+def calc_prtfl_obsrvd_risk(asset_props, index=None, columns=None, asset_obsrvd_risks=None, **kwargs):
     """Calculate the observed risk of the portfolio.
 
     Parameters
@@ -226,6 +451,9 @@ def calc_prtfl_obsrvd_risk(asset_props, index=None, columns=None, **kwargs):
     columns : list of shape (num_prtfls=1) and str, default None
         The column of the observed risk of the portfolio.
 
+    asset_obsrvd_risks : Series of shape (num_assets) and float, default None
+        The observed risks of the assets. If given, they are used instead of being calculated from `kwargs`.
+
     kwargs : dict
         The parameters to calculate the observed risks and the correlation coefficients of the assets.
 
@@ -234,15 +462,13 @@ def calc_prtfl_obsrvd_risk(asset_props, index=None, columns=None, **kwargs):
     return : DataFrame of shape (num_times=1, num_prtfls=1) and float
         The observed risk of the portfolio
     """
-    asset_risks = calc_asset_obsrvd_risks(dtype="Series", **kwargs)
+    if asset_obsrvd_risks is None:
+        asset_obsrvd_risks = calc_asset_obsrvd_risks(dtype="Series", **kwargs)
     corr_cf = calc_corr_cf(kwargs.get("prices"))
 
-    asset_props = asset_props.iloc[0, :]
-    num_assets = len(asset_props)
-    prtfl_var = 0.0
-    for a in range(num_assets):
-        for a1 in range(num_assets):
-            prtfl_var += corr_cf.iloc[a, a1] * asset_risks[a] * asset_risks[a1] * asset_props[a] * asset_props[a1]
+    # Scale the proportions by the risks to take the variance as the quadratic form over the correlation coefficients.
+    scaled_asset_props = asset_props.to_numpy(dtype=np.float64)[0] * np.asarray(asset_obsrvd_risks, dtype=np.float64)
+    prtfl_var = scaled_asset_props @ corr_cf.to_numpy(dtype=np.float64) @ scaled_asset_props
     prtfl_risk = np.sqrt(prtfl_var)
     return pd.DataFrame([prtfl_risk], index=index, columns=columns)
 
@@ -269,7 +495,13 @@ def _convert_dtype(data, dtype=None, index=None, columns=None):
     data : Series of shape (num_assets) or DataFrame of shape (num_times=1, num_assets) and float
         The converted data.
     """
-    if dtype == "Series":
+    if isinstance(data, np.ndarray) and dtype in ["Series", "DataFrame"]:
+        # Build the arrays calculated here in the final orientation without the alignment and the transposition.
+        if dtype == "Series":
+            data = pd.Series(data, index=columns, copy=False)
+        else:
+            data = pd.DataFrame(data.reshape(1, -1), index=[0] if index is None else index, columns=columns, copy=False)
+    elif dtype == "Series":
         data = pd.Series(data, index=columns)
     elif dtype == "DataFrame":
         data = pd.DataFrame(data, index=columns).T
@@ -280,3 +512,46 @@ def _convert_dtype(data, dtype=None, index=None, columns=None):
                   f"'dtype' must be in ['Series', 'DataFrame]."
         raise ValueError(message)
     return data
+
+
+def _to_complete_array(prices):
+    """Convert the prices to an array for the compiled calculations if they have no missing values.
+
+    Parameters
+    ----------
+    prices : DataFrame or ndarray of shape (num_times, num_assets) and float
+        The historical prices of the assets.
+
+    Returns
+    -------
+    prices_arr : ndarray of shape (num_times, num_assets) and float, or None
+        The array of the prices. None if the prices have missing values, which are left to pandas to be skipped.
+    """
+    prices_arr = np.ascontiguousarray(np.asarray(prices, dtype=FLOAT_DTYPE))
+    if np.isnan(prices_arr).any():
+        return None
+    return prices_arr
+
+
+def _to_complete_returns_array(prices, returns=None):
+    """Convert the returns to an array for the compiled calculations if they have no missing values.
+
+    Parameters
+    ----------
+    prices : DataFrame of shape (num_times, num_assets) and float
+        The historical prices of the assets, from which the returns are calculated if not given.
+
+    returns : DataFrame or ndarray of shape (num_times - 1, num_assets) and float, default None
+        The historical returns of the assets.
+
+    Returns
+    -------
+    returns_arr : ndarray of shape (num_times - 1, num_assets) and float, or None
+        The array of the returns. None if the prices or the returns given have missing values.
+    """
+    if returns is not None:
+        return _to_complete_array(returns)
+    prices_arr = _to_complete_array(prices)
+    if prices_arr is None:
+        return None
+    return _kernels.calc_returns(prices_arr)
@@ -1,11 +1,26 @@
 import os
+import functools
 import pandas as pd
 import configparser
 
 
+# The converters of the parameter values by their types
+_CONVERTERS = {
+    int: int,
+    float: float,
+    bool: lambda value: value == "True",
+    str: str,
+    list: lambda value: value.split(","),
+    pd.Timestamp: pd.to_datetime,
+}
+
+
 def read_params(setting_file_dir=".", setting_file_name="."):
     """Read the parameters from the setting file.
 
+    The setting file and the CSV files referred to by it are read once and cached until they are modified, and the
+    parameters are newly built on every call so that the caller can modify them.
+
     Parameters
     ----------
     setting_file_dir : str, default None, default "."
@@ -19,8 +34,7 @@ def read_params(setting_file_dir=".", setting_file_name="."):
     params : dict
         The parameters to be used in the simulation.
     """
-    param_file = configparser.ConfigParser()
-    param_file.read(os.path.join(setting_file_dir, setting_file_name), "utf-8")
+    param_file_values = _read_setting_file(*_file_key(os.path.join(setting_file_dir, setting_file_name)))
 
     section_list = ["dataset", "simulation", "trigger", "problem", "solver"]
     dataset_param_set = {
@@ -28,21 +42,26 @@ def read_params(setting_file_dir=".", setting_file_name="."):
         "start_time": pd.Timestamp,
         "end_time": pd.Timestamp,
         "interest_rate": float,
+        "is_cache": bool,
     }
     simulation_param_set = {
         "init_prtfl_valtn": float,
         "window_day": int,
         "min_reblncng_intrvl_day": int,
+        "solve_n_jobs": int,
+        "output_fields": list,
     }
     trigger_param_set = {
         "trigger_class": str,
         "test_method": str,
         "prob_thrshld": float,
+        "test_n_jobs": int,
         "reblncng_intrvl_day": int,
     }
     problem_param_set = {
         "problem_class": str,
         "return_lower_qntl": float,
+        "cov_estimator": str,
     }
     solver_param_set = {
         "solver_class": str,
@@ -62,33 +81,97 @@ def read_params(setting_file_dir=".", setting_file_name="."):
 
     params = {}
     for section, param_set in all_param_set.items():
+        # Walk the options present in the section once instead of looking up each parameter.
+        if section in param_file_values:
+            param_values = param_file_values[section]
+        else:
+            param_values = {}
+            print(configparser.NoSectionError(section))
         for param_name, param_type in param_set.items():
-            try:
-                param_value = param_file.get(section, param_name)
-            except Exception as e:
-                print(e)
+            if param_name not in param_values:
+                if section in param_file_values:
+                    print(configparser.NoOptionError(param_name, section))
                 continue
-            param_value = del_comment(param_value)
-            if param_type == int:
-                params[param_name] = int(param_value)
-            elif param_type == float:
-                params[param_name] = float(param_value)
-            elif param_type == bool:
-                params[param_name] = param_value == "True"
-            elif param_type == str:
-                params[param_name] = str(param_value)
-            elif param_type == pd.Timestamp:
-                params[param_name] = pd.to_datetime(param_value)
-            elif param_type == "csv_file":
+            param_value = del_comment(param_values[param_name])
+            if param_type == "csv_file":
                 columns_name = param_name.replace("_list", "")
-                params[param_name] = pd.read_csv(os.path.join(setting_file_dir, param_value))[columns_name].to_list()
+                csv_file_key = _file_key(os.path.join(setting_file_dir, param_value))
+                params[param_name] = list(_read_csv_column(*csv_file_key, columns_name))
             else:
-                message = f"Invalid value for 'param_type': {param_type}"
-                ValueError(message)
+                params[param_name] = _CONVERTERS[param_type](param_value)
 
     return params
 
 
+def _file_key(file_path):
+    """Make the key of the file to cache what is read from it until it is modified.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the file.
+
+    Returns
+    -------
+    file_path : str
+        The absolute path of the file.
+
+    mtime_ns : int or None
+        The modification time of the file in nanoseconds, or None if the file does not exist.
+    """
+    file_path = os.path.abspath(file_path)
+    try:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return file_path, mtime_ns
+
+
+@functools.lru_cache(maxsize=32)
+def _read_setting_file(file_path, mtime_ns):
+    """Read the options of all the sections from the setting file, cached until the file is modified.
+
+    Parameters
+    ----------
+    file_path : str
+        The absolute path of the parameter setting file.
+
+    mtime_ns : int or None
+        The modification time of the file in nanoseconds, which is used only as the key of the cache.
+
+    Returns
+    -------
+    param_file_values : dict
+        The raw strings of the options by their names by the sections. It must not be modified since it is shared.
+    """
+    param_file = configparser.ConfigParser()
+    param_file.read(file_path, "utf-8")
+    return {section: dict(param_file.items(section)) for section in param_file.sections()}
+
+
+@functools.lru_cache(maxsize=32)
+def _read_csv_column(file_path, mtime_ns, column_name):
+    """Read the column from the CSV file, cached until the file is modified.
+
+    Parameters
+    ----------
+    file_path : str
+        The absolute path of the CSV file.
+
+    mtime_ns : int or None
+        The modification time of the file in nanoseconds, which is used only as the key of the cache.
+
+    column_name : str
+        The name of the column to read.
+
+    Returns
+    -------
+    values : tuple
+        The values of the column.
+    """
+    return tuple(pd.read_csv(file_path)[column_name].to_list())
+
+
 def del_comment(string):
     """Delete the comment from the parameter setting string.
 
@@ -102,4 +185,4 @@ def del_comment(string):
     string : str
         The parameter setting string without the comment.
     """
-    return string.split('#')[0].replace(' ', '')
+    return string.partition('#')[0].replace(' ', '')
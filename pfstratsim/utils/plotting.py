@@ -1,8 +1,7 @@
 import os
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-import joblib
 
 
 def plot(input_dir=".", output_dir="."):
@@ -15,106 +14,157 @@ def plot(input_dir=".", output_dir="."):
 
     output_dir : str, default None, default "."
         The directory of the figures.
+
+    The panels of the fields not stored by the simulation, which are restricted by `output_fields`, are skipped.
     """
     # Set the configures for plotting.
     plt.style.use("seaborn-whitegrid")
     plt.rcParams["font.size"] = 16
 
-    # Extract the data to be plotted.
-    data_history = joblib.load(os.path.join(input_dir, "data_history"))
-    prices = data_history["prices"]
-    asset_name_list = prices.columns
-    idntcl_dstrbtn_prob_history = data_history["idntcl_dstrbtn_prob"]
-    prtfl_expctd_value_history = data_history["prtfl_expctd_value"]
-    prtfl_obsrvd_value_history = data_history["prtfl_obsrvd_value"]
-    asset_returns_history = data_history["asset_returns"]
-    asset_valtns_history = data_history["asset_valtns"]
-    prtfl_valtn_history = data_history["prtfl_valtn"]
-    asset_props_history = data_history["asset_props"]
-
-    # Set the common setting.
-    nrows = 10
-    fig, ax = plt.subplots(nrows=nrows, figsize=(20, 5 * nrows), sharex="col")
+    # Extract the data to be plotted, skipping the fields not stored by the simulation.
+    keys = [
+        "prices", "idntcl_dstrbtn_prob", "prtfl_expctd_value", "prtfl_obsrvd_value", "asset_returns", "asset_valtns",
+        "prtfl_valtn", "asset_props",
+    ]
+    data_history = {}
+    for key in keys:
+        file_path = os.path.join(input_dir, "data_history", f"{key}.parquet")
+        if os.path.isfile(file_path):
+            data_history[key] = pd.read_parquet(file_path)
+
+    # Set the panels of the data stored, each with its title and the function to plot it.
     args_expctd = {"marker": "o", "label": "expected", "color": "green", "alpha": 0.3}
     args_obsrvd = {"marker": "o", "label": "observed", "color": "blue"}
     args_prfmnc = {"marker": "o", "label": "performance", "color": "blue"}  # , "linewidth": 3}
+    prtfl_value_histories = [
+        (data_history[key], args)
+        for key, args in [("prtfl_expctd_value", args_expctd), ("prtfl_obsrvd_value", args_obsrvd)]
+        if key in data_history
+    ]
+    panels = []
+    if "prices" in data_history:
+        panels.append(("The Prices", lambda ax: _plot_lines(ax, data_history["prices"])))
+    if "idntcl_dstrbtn_prob" in data_history:
+        panels.append((
+            "The Identical Distribution Probabilities", lambda ax: _plot_lines(ax, data_history["idntcl_dstrbtn_prob"])
+        ))
+    if "asset_props" in data_history:
+        panels.append(("The Asset Proportions", lambda ax: _plot_stacked_bars(ax, data_history["asset_props"])))
+    if "asset_valtns" in data_history:
+        panels.append(("The Asset Valuations", lambda ax: _plot_stacked_bars(ax, data_history["asset_valtns"])))
+    if "asset_returns" in data_history:
+        panels.append(("The Asset Returns", lambda ax: _plot_lines(ax, data_history["asset_returns"])))
+    if "prtfl_valtn" in data_history:
+        panels.append((
+            "The Portfolio Valuation", lambda ax: ax.plot(data_history["prtfl_valtn"]["prtfl_valtn"], **args_prfmnc)
+        ))
+    if len(prtfl_value_histories) > 0:
+        panels.append((
+            "The Portfolio Expected/Observed Valuation",
+            lambda ax: _plot_prtfl_values(ax, prtfl_value_histories, "valtn"),
+        ))
+        panels.append((
+            "The Portfolio Expected/Observed Sharpe Ratio",
+            lambda ax: _plot_prtfl_values(ax, prtfl_value_histories, "sharpe_ratio"),
+        ))
+        panels.append((
+            "The Portfolio Expected/Observed Return",
+            lambda ax: _plot_prtfl_values(ax, prtfl_value_histories, "return", is_bounded=True),
+        ))
+        panels.append((
+            "The Portfolio Expected/Observed Risk",
+            lambda ax: _plot_prtfl_values(ax, prtfl_value_histories, "risk"),
+        ))
+    if len(panels) == 0:
+        print(f"No historical data to plot in {input_dir}.")
+        return
+
+    # Set the common setting.
+    nrows = len(panels)
+    fig, ax = plt.subplots(nrows=nrows, figsize=(20, 5 * nrows), sharex="col", squeeze=False)
+    ax = ax[:, 0]
     suptitle = os.path.basename(input_dir)
     fig.suptitle(suptitle)
 
     # Plot the data.
-    i = 0
-    ax[i].set_title("The Prices")
-    for asset in prices:
-        ax[i].plot(prices[asset], label=asset)
-
-    i += 1
-    ax[i].set_title("The Identical Distribution Probabilities")
-    for asset in idntcl_dstrbtn_prob_history:
-        ax[i].plot(idntcl_dstrbtn_prob_history[asset], label=asset)
-
-    i += 1
-    ax[i].set_title("The Asset Proportions")
-    bottom = np.zeros(len(asset_props_history))
-    for a, asset_name in enumerate(asset_name_list):
-        ax[i].bar(asset_props_history.index, asset_props_history[asset_name], bottom=bottom, width=1.0,
-                  label=asset_name)
-        bottom += np.array(asset_props_history.iloc[:, a])
-
-    i += 1
-    ax[i].set_title("The Asset Valuations")
-    bottom = np.zeros(len(asset_valtns_history))
-    for a, asset_name in enumerate(asset_name_list):
-        ax[i].bar(asset_valtns_history.index, asset_valtns_history[asset_name], bottom=bottom, width=1.0,
-                  label=asset_name)
-        bottom += np.array(asset_valtns_history.iloc[:, a])
-
-    i += 1
-    ax[i].set_title("The Asset Returns")
-    for asset in prices:
-        ax[i].plot(asset_returns_history[asset], label=asset)
-
-    i += 1
-    ax[i].set_title("The Portfolio Valuation")
-    ax[i].plot(prtfl_valtn_history["prtfl_valtn"], **args_prfmnc)
-
-    i += 1
-    ax[i].set_title("The Portfolio Expected/Observed Valuation")
-    ax[i].plot(prtfl_expctd_value_history["valtn"], **args_expctd)
-    ax[i].plot(prtfl_obsrvd_value_history["valtn"], **args_obsrvd)
-
-    i += 1
-    ax[i].set_title("The Portfolio Expected/Observed Sharpe Ratio")
-    ax[i].plot(prtfl_expctd_value_history["sharpe_ratio"], **args_expctd)
-    ax[i].plot(prtfl_obsrvd_value_history["sharpe_ratio"], **args_obsrvd)
-
-    i += 1
-    ax[i].set_title("The Portfolio Expected/Observed Return")
-    ax[i].plot(prtfl_expctd_value_history["return"], **args_expctd)
-    ax[i].plot(prtfl_expctd_value_history["lower"], **args_expctd, linestyle="--")
-    ax[i].plot(prtfl_expctd_value_history["upper"], **args_expctd, linestyle="--")
-    ax[i].plot(prtfl_obsrvd_value_history["return"], **args_obsrvd)
-    ax[i].plot(prtfl_obsrvd_value_history["lower"], **args_obsrvd, linestyle="--")
-    ax[i].plot(prtfl_obsrvd_value_history["upper"], **args_obsrvd, linestyle="--")
-
-    i += 1
-    ax[i].set_title("The Portfolio Expected/Observed Risk")
-    ax[i].plot(prtfl_expctd_value_history["risk"], **args_expctd)
-    ax[i].plot(prtfl_obsrvd_value_history["risk"], **args_obsrvd)
+    for i, (title, plot_panel) in enumerate(panels):
+        ax[i].set_title(title)
+        plot_panel(ax[i])
 
     for i in range(nrows):
         ax[i].tick_params(labelbottom=True)
         ax[i].legend()
         ax[i].legend(loc="center right")
-    x_lower = prices.index[0]
-    x_upper = prices.index[-1]
-    x_delta = x_upper - x_lower
-    ax[i].set_xlim((x_lower, x_upper + 0.2 * x_delta))
+    time_index_list = [data.index for data in data_history.values() if len(data) > 0]
+    if len(time_index_list) > 0:
+        x_lower = min(time_index[0] for time_index in time_index_list)
+        x_upper = max(time_index[-1] for time_index in time_index_list)
+        x_delta = x_upper - x_lower
+        ax[i].set_xlim((x_lower, x_upper + 0.2 * x_delta))
 
     # Save the figures.
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    pdf = PdfPages(os.path.join(output_dir, f"{suptitle}_summary.pdf"))
-    pdf.savefig()
-    pdf.close()
-    plt.savefig(os.path.join(output_dir, f"{suptitle}_summary.png"))
-    plt.close()
+    os.makedirs(output_dir, exist_ok=True)
+    # The PDF is drawn by its vector backend, so the raster of the PNG cannot be shared with it without rasterizing it.
+    fig.savefig(os.path.join(output_dir, f"{suptitle}_summary.pdf"), format="pdf")
+    fig.savefig(os.path.join(output_dir, f"{suptitle}_summary.png"), format="png")
+    plt.close(fig)
+
+
+def _plot_lines(ax, data):
+    """Plot the data of the assets as the lines.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to plot the lines.
+
+    data : DataFrame of shape (num_times, num_assets) and float
+        The historical data of the assets.
+    """
+    for asset_name in data:
+        ax.plot(data[asset_name], label=asset_name)
+
+
+def _plot_prtfl_values(ax, prtfl_value_histories, column, is_bounded=False):
+    """Plot the expected and/or observed values of the portfolio as the lines.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to plot the lines.
+
+    prtfl_value_histories : list of tuple of DataFrame and dict
+        The historical values of the portfolio stored with the arguments of their lines.
+
+    column : str
+        The column of the values to plot.
+
+    is_bounded : bool, default False
+        The option whether to plot the lower and the upper bounds of the values as well.
+    """
+    for prtfl_value_history, args in prtfl_value_histories:
+        ax.plot(prtfl_value_history[column], **args)
+        if is_bounded:
+            ax.plot(prtfl_value_history["lower"], **args, linestyle="--")
+            ax.plot(prtfl_value_history["upper"], **args, linestyle="--")
+
+
+def _plot_stacked_bars(ax, data):
+    """Plot the data of the assets as the bars stacked in the order of the assets.
+
+    Parameters
+    ----------
+    ax : Axes
+        The axes to plot the bars.
+
+    data : DataFrame of shape (num_times, num_assets) and float
+        The historical data of the assets.
+    """
+    asset_name_list = data.columns
+    values = data.to_numpy(dtype=float)
+    # Calculate the bottoms of all the bars at once instead of accumulating them asset by asset.
+    bottoms = np.zeros_like(values)
+    np.cumsum(values[:, :-1], axis=1, out=bottoms[:, 1:])
+    x = data.index.to_numpy()
+    for a, asset_name in enumerate(asset_name_list):
+        ax.bar(x, values[:, a], bottom=bottoms[:, a], width=1.0, label=asset_name)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from .parameter_calculation import calc_corr_cf_from_moments
+
+
+class RollingMoments(object):
+    """The moments of the prices in the moving window updated incrementally.
+
+    The sums and the sums of the products of the prices are updated by the rows leaving and entering the window, or
+    summed up again if it is cheaper. The prices are shifted by the first ones for the numerical stability, which does
+    not change the correlation coefficients.
+
+    Parameters
+    ----------
+    prices : DataFrame of shape (num_times, num_assets) and float
+        The historical prices of the assets over the whole period.
+
+    Attributes
+    ----------
+    is_updatable_ : bool
+        True if the prices have no missing values, without which the moments are not updated incrementally.
+    """
+    def __init__(self, prices):
+        prices_arr = prices.to_numpy(dtype=float)
+        self._columns = prices.columns
+        self._is_updatable_ = not np.isnan(prices_arr).any()
+        self._prices_arr = prices_arr - prices_arr[0]
+        self._window = (0, 0)
+        self._sums = np.zeros(len(self._columns))
+        self._product_sums = np.zeros((len(self._columns), len(self._columns)))
+
+    def update(self, lower_pos, upper_pos):
+        """Move the window to the positions given.
+
+        Parameters
+        ----------
+        lower_pos : int
+            The position of the oldest date-time in the window.
+
+        upper_pos : int
+            The position following the latest date-time in the window.
+        """
+        prev_lower_pos, prev_upper_pos = self._window
+        if (lower_pos - prev_lower_pos) + (upper_pos - prev_upper_pos) < upper_pos - lower_pos:
+            leaving_prices = self._prices_arr[prev_lower_pos:lower_pos]
+            entering_prices = self._prices_arr[prev_upper_pos:upper_pos]
+            self._sums += entering_prices.sum(axis=0) - leaving_prices.sum(axis=0)
+            self._product_sums += entering_prices.T @ entering_prices - leaving_prices.T @ leaving_prices
+        else:
+            window_prices = self._prices_arr[lower_pos:upper_pos]
+            self._sums = window_prices.sum(axis=0)
+            self._product_sums = window_prices.T @ window_prices
+        self._window = (lower_pos, upper_pos)
+
+    def calc_corr_cf(self):
+        """Calculate the correlation coefficients of the assets in the current window.
+
+        Returns
+        -------
+        corr_cf : DataFrame of shape (num_assets, num_assets) and float
+            The correlation coefficients of the assets.
+        """
+        lower_pos, upper_pos = self._window
+        return calc_corr_cf_from_moments(upper_pos - lower_pos, self._sums, self._product_sums, self._columns)
+
+    @property
+    def is_updatable_(self):
+        return self._is_updatable_
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pfstratsim.problems import SharpeRatioMaximization
+from pfstratsim.solvers import Solver, QuadraticProgramming, CvxpyProgramming
+
+
+def _make_declining_prices(num_times=60, num_assets=4, seed=0):
+    """Make the prices of the assets all declining, whose expected returns are all negative."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(-0.01, 0.01, (num_times, num_assets)) * np.arange(1, num_assets + 1)
+    index = pd.date_range("2020-01-01", periods=num_times, freq="B")
+    columns = [f"ASSET{a}" for a in range(num_assets)]
+    return pd.DataFrame(100.0 * np.cumprod(1.0 + returns, axis=0), index=index, columns=columns)
+
+
+@pytest.mark.parametrize("solver_algo", [QuadraticProgramming, CvxpyProgramming])
+def test_solve_without_positive_expected_return(solver_algo):
+    prices = _make_declining_prices()
+    problem = SharpeRatioMaximization()
+    assert problem.define(prices, prices.index[-1])
+    asset_expctd_returns = problem.asset_expctd_returns_.to_numpy()
+    asset_expctd_cov = problem.asset_expctd_cov_
+    assert asset_expctd_returns.max() <= 0.0
+
+    solver = Solver(solver_algo())
+    assert solver.solve(problem)
+
+    model = problem.cncrt_model_
+    asset_props = np.array([model.asset_props[a].value for a in model.set_asset])
+    assert asset_props.sum() == pytest.approx(1.0)
+    assert (asset_props >= 0.0).all()
+
+    # No portfolio has a higher Sharpe ratio than the solution.
+    sharpe_ratio = asset_expctd_returns @ asset_props / np.sqrt(asset_props @ asset_expctd_cov @ asset_props)
+    rng = np.random.default_rng(1)
+    other_asset_props = rng.dirichlet(np.full(len(asset_props), 0.5), 10000)
+    other_sharpe_ratios = other_asset_props @ asset_expctd_returns \
+        / np.sqrt(np.einsum("ij,jk,ik->i", other_asset_props, asset_expctd_cov, other_asset_props))
+    assert (other_sharpe_ratios <= sharpe_ratio + 1e-12).all()
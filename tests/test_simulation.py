@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from pfstratsim.simulations import Simulation
+
+
+def _make_prices_with_cash(num_times=120, num_assets=3, interest_rate=0.01, seed=0):
+    """Make the random prices of the assets with the ones of cash growing at a constant rate."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, (num_times, num_assets))
+    index = pd.date_range("2020-01-01", periods=num_times, freq="D")
+    columns = [f"ASSET{a}" for a in range(num_assets)]
+    prices = pd.DataFrame(100.0 * np.cumprod(1.0 + returns, axis=0), index=index, columns=columns)
+    growth_factor = 1.0 + interest_rate / num_times
+    prices["CASH"] = np.concatenate([[1.0], np.cumprod(np.full(num_times - 1, growth_factor))])
+    return prices
+
+
+def test_cash_obsrvd_risks_are_exactly_zero(tmp_path):
+    prices = _make_prices_with_cash()
+    simulation = Simulation(
+        trigger_class="regular_basis", problem_class="risk_minimization", solver_class="quadratic_programming",
+        prices=prices, start_time=prices.index[40], end_time=prices.index[-1], window_day=28, reblncng_intrvl_day=7,
+        return_lower_qntl=0.7, result_dir=str(tmp_path), output_fields=["asset_obsrvd_risks"],
+    )
+    simulation.execute()
+    asset_obsrvd_risks = simulation._data_history_["asset_obsrvd_risks"]
+    assert len(asset_obsrvd_risks) > 0
+    assert (asset_obsrvd_risks["CASH"] == 0.0).all()
+    assert (asset_obsrvd_risks.drop(columns="CASH") > 0.0).all().all()